@@ -1,12 +1,14 @@
+import os
+import sys
+
 # import helper functions
 from helper import ImmoHelper
 import eda_generate_sweetviz_reports
 
-helper = ImmoHelper()
-df = helper.process_data(return_gde=False)
-df.to_csv('../data/clean.csv')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "eda"))
+from utils.build import build
 
-df_gde = helper.process_data(return_gde=True)
-df_gde.to_csv('../data/clean_gde.csv')
+helper = ImmoHelper()
+df = build(helper, {"../data/clean.csv": "clean", "../data/clean_gde.csv": "clean_gde"})
 
-eda_generate_sweetviz_reports.generate_sweetviz_report()
\ No newline at end of file
+eda_generate_sweetviz_reports.generate_sweetviz_report(df)
@@ -1,11 +1,19 @@
+import os
+import sys
+
 # import helper functions
 from helper_kaggle import ImmoHelper
 
-helper = ImmoHelper(url="../data/kaggle_uncleaned.csv", type="csv")
-helper.data.to_parquet("../data/kaggle_uncleaned.parquet")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "eda"))
+from utils.build import build
 
-df = helper.process_data(return_gde=False)
-df.to_parquet("../data/kaggle_cleaned.parquet")
+helper = ImmoHelper(url="../data/kaggle_uncleaned.csv", type="csv")
+helper.dataset.load().to_parquet("../data/kaggle_uncleaned.parquet")
 
-df_gde = helper.process_data(return_gde=True)
-df_gde.to_parquet("../data/kaggle_gde_cleaned.parquet")
+build(
+    helper,
+    {
+        "../data/kaggle_cleaned.parquet": "clean",
+        "../data/kaggle_gde_cleaned.parquet": "clean_gde",
+    },
+)
@@ -1,12 +1,22 @@
+import os
+import sys
+
 # import helper functions
 from helper_new import ImmoHelper
 import eda_generate_sweetviz_reports_new
 
-helper = ImmoHelper()
-df = helper.process_data(return_gde=False)
-df.to_csv("../data/clean_v2.csv")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "eda"))
+from utils.build import build
 
-df_gde = helper.process_data(return_gde=True)
-df_gde.to_csv("../data/clean_gde_v2.csv")
+helper = ImmoHelper()
+df = build(
+    helper,
+    {
+        "../data/clean_v2.csv": "clean",
+        "../data/clean_gde_v2.csv": "clean_gde",
+        # partitioned by canton and type, read with utils.export.read_partitioned
+        "../data/clean_gde_v2": "clean_gde",
+    },
+)
 
-eda_generate_sweetviz_reports_new.generate_sweetviz_report()
+eda_generate_sweetviz_reports_new.generate_sweetviz_report(df)
@@ -1,29 +1,18 @@
-import pandas as pd
-import numpy as np
-import sweetviz as sv
-
-def generate_sweetviz_report():
-
-  df = pd.read_csv('../data/clean_gde.csv')
-  df_dirty = pd.read_csv('../data/immoscout_cleaned_lat_lon_fixed_v9.csv')
+import os
+import sys
 
-  sweet_report = sv.analyze(df)
-  sweet_report.show_html('sweetviz-reports/sweetviz_report.html')
-
-  sweet_report = sv.analyze(df_dirty)
-  sweet_report.show_html('sweetviz-reports/sweetviz_report_uncleaned.html')
+import pandas as pd
 
-  cols = ['ForestDensityL', 'ForestDensityM', 'ForestDensityS', 'NoisePollutionRailwayL', 'NoisePollutionRailwayM', 'NoisePollutionRailwayS', 'NoisePollutionRoadL', 'NoisePollutionRoadM', 'NoisePollutionRoadS', 'PopulationDensityL', 'PopulationDensityM', 'PopulationDensityS', 'RiversAndLakesL', 'RiversAndLakesM', 'RiversAndLakesS', 'WorkplaceDensityL', 'WorkplaceDensityM', 'WorkplaceDensityS', 'distanceToTrainStation', 'zip_code']
-  sweet_report = sv.analyze(df.loc[:, cols])
-  sweet_report.show_html('sweetviz-reports/sweetviz_SML.html')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "eda"))
+from utils.reports import generate_reports
 
-  sweet_report = sv.analyze(df.loc[:, 'gde_area_agriculture_percentage':'gde_workers_total'])
-  sweet_report.show_html('sweetviz-reports/sweetviz_gde.html')
 
-  cols = ['municipality', 'street', 'street_nr', 'zip_code', 'canton', 'Latitude', 'Longitude']
-  sweet_report = sv.analyze(df.loc[:, cols])
-  sweet_report.show_html('sweetviz-reports/sweetviz_locality.html')
+def generate_sweetviz_report(df=None, df_dirty=None, max_rows=None, n_jobs=None):
 
-  cols = ['living_space', 'rooms', 'plot_area', 'floor_space', 'floor', 'type']
-  sweet_report = sv.analyze(df.loc[:, cols])
-  sweet_report.show_html('sweetviz-reports/sweetviz_immo.html')
\ No newline at end of file
+    if df is None:
+        df = pd.read_csv("../data/clean_gde.csv")
+    if df_dirty is None:
+        df_dirty = pd.read_csv("../data/immoscout_cleaned_lat_lon_fixed_v9.csv")
+    return generate_reports(
+        df, "sweetviz-reports", uncleaned=df_dirty, max_rows=max_rows, n_jobs=n_jobs
+    )
@@ -1,61 +1,28 @@
-import pandas as pd
-import numpy as np
-import sweetviz as sv
-
+import os
+import sys
 
-def generate_sweetviz_report():
+import pandas as pd
 
-    df = pd.read_csv("../data/clean_gde_v2.csv")
-    df_dirty = pd.read_csv("../data/immoscout_cleaned_lat_lon_fixed_v9.csv")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "eda"))
+from utils.reports import generate_reports
 
-    sweet_report = sv.analyze(df)
-    sweet_report.show_html("sweetviz-reports/sweetviz_report.html")
 
-    sweet_report = sv.analyze(df_dirty)
-    sweet_report.show_html("sweetviz-reports/sweetviz_report_uncleaned.html")
+def generate_sweetviz_report(df=None, df_dirty=None, max_rows=None, n_jobs=None):
+    """Renders the sweetviz reports, in parallel, see utils.reports.generate_reports.
 
-    cols = [
-        "ForestDensityL",
-        "ForestDensityM",
-        "ForestDensityS",
-        "NoisePollutionRailwayL",
-        "NoisePollutionRailwayM",
-        "NoisePollutionRailwayS",
-        "NoisePollutionRoadL",
-        "NoisePollutionRoadM",
-        "NoisePollutionRoadS",
-        "PopulationDensityL",
-        "PopulationDensityM",
-        "PopulationDensityS",
-        "RiversAndLakesL",
-        "RiversAndLakesM",
-        "RiversAndLakesS",
-        "WorkplaceDensityL",
-        "WorkplaceDensityM",
-        "WorkplaceDensityS",
-        "distanceToTrainStation",
-        "zip_code",
-    ]
-    sweet_report = sv.analyze(df.loc[:, cols])
-    sweet_report.show_html("sweetviz-reports/sweetviz_SML.html")
+    Args:
+        df (DataFrame, optional): Cleaned data, e.g. returned by build. Defaults to ../data/clean_gde_v2.csv.
+        df_dirty (DataFrame, optional): Uncleaned data. Defaults to ../data/immoscout_cleaned_lat_lon_fixed_v9.csv.
+        max_rows (int, optional): Row budget, sampled by canton and type. Defaults to None (all rows).
+        n_jobs (int, optional): Worker processes. Defaults to os.cpu_count().
 
-    sweet_report = sv.analyze(
-        df.loc[:, "gde_area_agriculture_percentage":"gde_workers_total"]
+    Returns:
+        list: paths of the written reports
+    """
+    if df is None:
+        df = pd.read_csv("../data/clean_gde_v2.csv")
+    if df_dirty is None:
+        df_dirty = pd.read_csv("../data/immoscout_cleaned_lat_lon_fixed_v9.csv")
+    return generate_reports(
+        df, "sweetviz-reports", uncleaned=df_dirty, max_rows=max_rows, n_jobs=n_jobs
     )
-    sweet_report.show_html("sweetviz-reports/sweetviz_gde.html")
-
-    cols = [
-        "municipality",
-        "street",
-        "street_nr",
-        "zip_code",
-        "canton",
-        "Latitude",
-        "Longitude",
-    ]
-    sweet_report = sv.analyze(df.loc[:, cols])
-    sweet_report.show_html("sweetviz-reports/sweetviz_locality.html")
-
-    cols = ["living_space", "rooms", "plot_area", "floor_space", "floor", "type"]
-    sweet_report = sv.analyze(df.loc[:, cols])
-    sweet_report.show_html("sweetviz-reports/sweetviz_immo.html")
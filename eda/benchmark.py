@@ -0,0 +1,238 @@
+"""Benchmarks the cleaning pipeline on synthetic data, offline.
+
+Times every stage of the cleaning (load, coalesce, address parsing, floor and area
+parsing, canton lookup, the whole process_data and the parquet export) for each
+dataset version and size, and reports throughput and peak resident memory. The
+fixtures are generated once by utils.synthetic and reused by later runs.
+
+    python eda/benchmark.py --rows 10000 100000 1000000 --json bench.json
+    python eda/benchmark.py --baseline bench.json  # exit code 1 on regressions
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import pandas as pd
+
+from utils import helper_v1, helper_v2
+from utils.address import parse_address
+from utils.cache import get_cache
+from utils.coalesce import coalesce_all
+from utils.parsers import parse_area, parse_floor
+from utils.pipeline import Extract
+from utils.postcodes import load_postcodes
+from utils.synthetic import VERSIONS, write_fixtures
+
+HELPERS = {"v1": helper_v1.ImmoHelper, "v2": helper_v2.ImmoHelper}
+
+
+def _high_water_mb():
+    # VmHWM of the process, None without /proc
+    try:
+        with open("/proc/self/status") as f:
+            return int(re.search(r"VmHWM:\s+(\d+)", f.read()).group(1)) / 1024
+    except (OSError, AttributeError):
+        return None
+
+
+def _peak_mb(stage, state):
+    """Runs ``stage`` and returns the high-water mark of the resident memory in MB.
+
+    Resident memory covers the Arrow buffers and numpy arrays that tracemalloc does
+    not see. On Linux the high-water mark is reset before the stage. Elsewhere the
+    high-water mark of the whole process so far is returned, an upper bound.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        reset = True
+    except OSError:
+        reset = False
+    stage(state)
+    peak = _high_water_mb() if reset else None
+    if peak is not None or resource is None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def _stages(version, path, export_path):
+    # (name, function) pairs, each function takes the result of the previous stages
+    helper_class = HELPERS["v1" if version == "v1" else "v2"]
+    spec = helper_class.PIPELINE
+    kwargs = {"kaggle": True} if version == "kaggle" else {}
+
+    def load(state):
+        state["helper"] = helper_class(path, cache=False)
+        state["data"] = state["helper"].data
+
+    def coalesce(state):
+        # Only the merges of raw columns, zip code and municipality come later
+        raw = {
+            feature: sources
+            for feature, sources in spec.coalesce.items()
+            if all(source in state["data"] for source in sources)
+        }
+        state["merged"], _ = coalesce_all(state["data"], raw)
+
+    def address(state):
+        parsed = [
+            parse_address(state["data"][step.inputs[0]], step.pattern)
+            for step in spec.steps
+            if isinstance(step, Extract)
+        ]
+        state["address"] = parsed[0]
+
+    def floor(state):
+        parse_floor(state["merged"]["floor"])
+
+    def area(state):
+        parse_area(state["merged"]["plot_area"])
+        parse_area(state["merged"]["floor_space"])
+
+    def canton(state):
+        load_postcodes().canton(state["address"]["zip_code"])
+
+    def process_data(state):
+        state["cleaned"] = state["helper"].process_data(return_gde=True, **kwargs)
+
+    def export(state):
+        state["cleaned"].to_parquet(export_path)
+
+    return [
+        ("load", load),
+        ("coalesce", coalesce),
+        ("address", address),
+        ("floor", floor),
+        ("area", area),
+        ("canton", canton),
+        ("process_data", process_data),
+        ("export", export),
+    ]
+
+
+def run(versions=VERSIONS, rows=(10000, 100000), fixtures=None, repeat=1, memory=True):
+    """Runs the benchmark.
+
+    Args:
+        versions (list, optional): Dataset versions. Defaults to VERSIONS.
+        rows (list, optional): Dataset sizes. Defaults to (10000, 100000).
+        fixtures (str, optional): Directory of the synthetic datasets. Defaults to <cache>/benchmark.
+        repeat (int, optional): Timed runs per stage, the fastest counts. Defaults to 1.
+        memory (bool, optional): Measure the peak resident memory of every stage in an extra run. Defaults to True.
+
+    Returns:
+        DataFrame: one row per version, size and stage with seconds, rows_per_s and peak_mb (resident high-water mark)
+    """
+    fixtures = fixtures or os.path.join(get_cache().root, "benchmark")
+    results = []
+    # The synthetic postcodes replace plz.xlsx during the run only
+    plz_url = os.environ.get("IMMO_PLZ_URL")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_path = os.path.join(tmp, "cleaned.parquet")
+            for version in versions:
+                for n in rows:
+                    paths = write_fixtures(fixtures, n, version)
+                    # Loaded outside the timings
+                    os.environ["IMMO_PLZ_URL"] = paths["postcodes"]
+                    load_postcodes()
+                    stages = _stages(version, paths["listings"], export_path)
+
+                    timings = {name: float("inf") for name, _ in stages}
+                    for _ in range(repeat):
+                        state = {}
+                        for name, stage in stages:
+                            start = time.perf_counter()
+                            stage(state)
+                            elapsed = time.perf_counter() - start
+                            timings[name] = min(timings[name], elapsed)
+
+                    peaks = {}
+                    if memory:
+                        state = {}
+                        for name, stage in stages:
+                            peaks[name] = _peak_mb(stage, state)
+
+                    for name, _ in stages:
+                        results.append(
+                            {
+                                "version": version,
+                                "rows": n,
+                                "stage": name,
+                                "seconds": timings[name],
+                                "rows_per_s": n / timings[name],
+                                "peak_mb": peaks.get(name),
+                            }
+                        )
+    finally:
+        if plz_url is None:
+            os.environ.pop("IMMO_PLZ_URL", None)
+        else:
+            os.environ["IMMO_PLZ_URL"] = plz_url
+    return pd.DataFrame(results)
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Finds stages whose throughput dropped by more than ``tolerance`` against ``baseline``.
+
+    Args:
+        results (DataFrame): Output of run.
+        baseline (DataFrame): Earlier output of run.
+        tolerance (float, optional): Accepted relative slowdown. Defaults to 0.2.
+
+    Returns:
+        DataFrame: regressed stages with both throughputs
+    """
+    merged = results.merge(
+        baseline, on=["version", "rows", "stage"], suffixes=("", "_baseline")
+    )
+    ratio = merged["rows_per_s"] / merged["rows_per_s_baseline"]
+    return merged.loc[
+        ratio < 1 - tolerance,
+        ["version", "rows", "stage", "rows_per_s", "rows_per_s_baseline"],
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--versions", nargs="+", default=VERSIONS, choices=VERSIONS)
+    parser.add_argument("--rows", nargs="+", type=int, default=[10000, 100000])
+    parser.add_argument("--fixtures", help="directory of the synthetic datasets")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results of an earlier run to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.versions, args.rows, args.fixtures, args.repeat, not args.no_memory
+    )
+    print(results.to_string(index=False, float_format="{:.3f}".format))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results.to_dict(orient="records"), f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, pd.DataFrame(json.load(f)), args.tolerance)
+        if len(regressions):
+            print("\nRegressions against {}:".format(args.baseline))
+            print(regressions.to_string(index=False))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
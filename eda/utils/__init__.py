@@ -0,0 +1 @@
+"""Helper code shared by the eda notebooks and the cleaning scripts."""
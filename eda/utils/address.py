@@ -0,0 +1,90 @@
+import re
+
+from .parsers import map_unique_records
+
+# Every field is an optional lookahead anchored at the start of the string, so a
+# single match extracts all fields with the same result as one re.search per field.
+## address in v2/kaggle: "Bahnhofstrasse 12, 8001 Zürich, ZH"
+ADDRESS = re.compile(
+    r"^(?=(?:.*?(?P<zip_code>\d{4}) [A-ZÀ-Ÿa-z])?)"
+    r"(?=(?:.*?\d{4} (?P<municipality>.+?),)?)"
+    r"(?=(?:(?P<street>.+), \d{4})?)"
+)
+## address in v1, includes the canton
+ADDRESS_V1 = re.compile(
+    r"^(?=(?:.*?(?P<zip_code>\d{4}) [A-ZÀ-Ÿ])?)"
+    r"(?=(?:.*?\d{4} (?P<municipality>.+?),)?)"
+    r"(?=(?:.*?, ?(?P<canton>[A-ZÀ-Ÿ]{2}))?)"
+    r"(?=(?:(?P<street>.+), ?\d{4})?)"
+)
+## address_s in v2/kaggle: "Bahnhofstrasse 12, 8001 Zürich"
+ADDRESS_S = re.compile(
+    r"^(?=(?:.*?(?P<zip_code>\d{4}) [A-ZÀ-Ÿa-z])?)"
+    r"(?=(?:.*?\d{4} (?P<municipality>.+)$)?)"
+)
+
+## location_parsed in kaggle: "Strasse: Bahnhofstrasse 12 plz: 8001 ... Kanton: ZH"
+LOCATION = re.compile(
+    r"^(?=(?:Strasse: ?(?P<street>.+?) plz)?)"
+    r"(?=(?:[\s\S]*?plz: ?(?P<zip_code>\d{4}))?)"
+    r"(?=(?:[\s\S]*?Kanton: ?(?P<canton>\w{2})$)?)"
+)
+
+# Known typos in the zip codes of v2/kaggle
+ZIP_TYPOS = {2737: 2735, 3217: 3127, 3364: 3365, 6511: 6593, 8371: 8370}
+
+_STREET_NR = re.compile(r"^.+ (\d.+)")
+_STREET_NAME = re.compile(r"^(.+?) \d")
+
+
+def pattern_fields(pattern):
+    """Returns the field names extracted with ``pattern``, street_nr included."""
+    columns = sorted(pattern.groupindex, key=pattern.groupindex.get)
+    if "street" in columns:
+        columns.append("street_nr")
+    return columns
+
+
+def parse_address_value(x, pattern=ADDRESS):
+    """Parses a single address, see parse_address.
+
+    Args:
+        x (str): Address.
+        pattern (Pattern, optional): ADDRESS, ADDRESS_V1 or ADDRESS_S. Defaults to ADDRESS.
+
+    Returns:
+        dict: field name to value, None for missing fields
+    """
+    fields = pattern.match(x).groupdict()
+    if fields["zip_code"] is not None:
+        fields["zip_code"] = int(fields["zip_code"])
+    if "street" in fields:
+        street = fields["street"]
+        fields["street_nr"] = None
+        if street is not None:
+            match = _STREET_NR.match(street)
+            fields["street_nr"] = match.group(1) if match else None
+            match = _STREET_NAME.match(street)
+            fields["street"] = match.group(1).rstrip() if match else None
+    return fields
+
+
+def parse_address(series, pattern=ADDRESS):
+    """Splits addresses into zip code, municipality, (canton,) street and street number.
+
+    Every distinct address is matched once against one compiled pattern.
+
+    Args:
+        series (Series): Addresses.
+        pattern (Pattern, optional): ADDRESS, ADDRESS_V1 or ADDRESS_S. Defaults to ADDRESS.
+
+    Returns:
+        DataFrame: one column per field, zip_code as nullable Int64
+    """
+    parsed = map_unique_records(
+        series,
+        lambda x: tuple(parse_address_value(x, pattern).values()),
+        pattern_fields(pattern),
+    )
+    parsed["zip_code"] = parsed["zip_code"].astype("Int64")
+    return parsed
@@ -0,0 +1,211 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cache import cached_path
+from .dataset import LazyDataset
+from .dedup import deduplicate
+from .export import write_parquet_chunks
+from .profiles import ProfileStore
+from .schema import apply_schema
+from .spatial import neighbourhood_features
+
+_worker_helper = None
+
+
+def _init_worker(helper):
+    global _worker_helper
+    _worker_helper = helper
+    helper.prepare()
+
+
+def _process_block(args):
+    block, kwargs = args
+    return _worker_helper.process_data(data=block, **kwargs)
+
+
+class BaseImmoHelper(object):
+    """Loading and chunked execution shared by the ImmoHelper versions.
+
+    Subclasses declare the raw columns their process_data reads and implement
+    process_data(data=None, ...).
+
+    Args:
+        url (str): Location of the raw dataset.
+        type (str, optional): "parquet" or "csv". Defaults to "parquet".
+        cache (bool, optional): Download through the local dataset cache. Defaults to True.
+        refresh (bool, optional): Download again even if the dataset is cached. Defaults to False.
+        verify (bool, optional): Rehash the cached dataset and download it again if it is corrupted. Defaults to False.
+    """
+
+    # Raw columns read by process_data, everything else is loaded on demand via self.dataset
+    COLUMNS = []
+    COLUMN_RANGES = []
+    COLUMN_POSITIONS = []
+    # dtypes for CSV sources, so every chunk gets the same column types
+    CSV_DTYPES = None
+    # Cleaning spec of the dataset version, see pipeline.Pipeline and specs
+    PIPELINE = None
+
+    def __init__(self, url, type="parquet", cache=True, refresh=False, verify=False):
+        if cache:
+            url = cached_path(url, refresh=refresh, verify=verify)
+        self.dataset = LazyDataset(url, type=type, dtype=self.CSV_DTYPES)
+        self._data = None
+
+    def __getstate__(self):
+        # Worker processes get the helper without the loaded raw data
+        state = self.__dict__.copy()
+        state["_data"] = None
+        return state
+
+    @property
+    def columns(self):
+        """list: names of the raw columns read by process_data"""
+        return self.dataset.resolve(
+            self.COLUMNS, self.COLUMN_RANGES, self.COLUMN_POSITIONS
+        )
+
+    @property
+    def data(self):
+        """DataFrame: raw columns needed by process_data, read on first access."""
+        if self._data is None:
+            self._data = self.dataset.load(self.columns)
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+
+    def profile(self, store=None, name=None, refresh=False):
+        """Returns the column profile of the whole raw dataset, see profiles.Profile.
+
+        The profile is computed on the first call and read from ``store`` afterwards,
+        until the dataset file changes.
+
+        Args:
+            store (ProfileStore, optional): Defaults to ProfileStore().
+            name (str, optional): Name of the stored profile. Defaults to the dataset file name.
+            refresh (bool, optional): Profile again even if stored. Defaults to False.
+
+        Returns:
+            Profile: profile of all raw columns
+        """
+        store = store or ProfileStore()
+        path = self.dataset.path
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        token = [os.path.getsize(path), os.path.getmtime(path)]
+        # Read uncached, so the projected columns of self.data stay the only ones kept
+        return store.get(name, self.dataset.read, token=token, refresh=refresh)
+
+    def _drops_duplicates(self):
+        return self.PIPELINE is not None and self.PIPELINE.drop_duplicates
+
+    def _drop_gde(self, cleaned):
+        first, last = self.PIPELINE.gde
+        return cleaned.drop(columns=cleaned.loc[:, first:last].columns)
+
+    def prepare(self):
+        """Loads lookup tables used by process_data, called once per worker process."""
+
+    def process_data(self, data=None, **kwargs):
+        raise NotImplementedError
+
+    def process_parallel(self, data=None, n_jobs=None, block_rows=None, **kwargs):
+        """Runs process_data on row blocks in a process pool.
+
+        The blocks are concatenated in their original order and keep the original
+        index. Duplicates and neighbours can span blocks, so ``dedup``,
+        ``neighbourhood_km`` and the duplicate removal of specs with
+        ``drop_duplicates`` run again on the concatenated result. On platforms
+        spawning worker processes call this from within
+        ``if __name__ == "__main__":``.
+
+        Args:
+            data (DataFrame, optional): Uses self.data if left default. Defaults to None.
+            n_jobs (int, optional): Worker processes. Defaults to os.cpu_count().
+            block_rows (int, optional): Rows per block. Defaults to four blocks per worker.
+            **kwargs: Passed to process_data.
+
+        Returns:
+            DataFrame: tidy DataFrame
+        """
+        if data is None:
+            data = self.data
+        dedup = kwargs.pop("dedup", None)
+        neighbourhood_km = kwargs.pop("neighbourhood_km", None)
+        return_gde = kwargs.get("return_gde", False)
+        drop_duplicates = self._drops_duplicates()
+        if dedup or neighbourhood_km or drop_duplicates:
+            # These stages read the gde range, e.g. the coordinates
+            kwargs["return_gde"] = True
+        n_jobs = n_jobs or os.cpu_count()
+        if block_rows is None:
+            block_rows = max(1, -(-len(data) // (n_jobs * 4)))
+        blocks = [
+            (data.iloc[start : start + block_rows], kwargs)
+            for start in range(0, max(len(data), 1), block_rows)
+        ]
+        self.prepare()
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(self,)
+        ) as executor:
+            # Categories differ between blocks, so the schema is applied again
+            cleaned = apply_schema(pd.concat(executor.map(_process_block, blocks)))
+        if drop_duplicates:
+            cleaned = cleaned.drop_duplicates()
+        if dedup:
+            cleaned = deduplicate(cleaned, how=dedup)
+        if neighbourhood_km:
+            features = neighbourhood_features(cleaned, neighbourhood_km)
+            cleaned = apply_schema(cleaned.join(features))
+        if kwargs.get("return_gde") and not return_gde:
+            cleaned = self._drop_gde(cleaned)
+        return cleaned
+
+    def iter_process(self, chunk_rows=100000, **kwargs):
+        """Streams the raw dataset through process_data chunk by chunk.
+
+        Peak memory depends on chunk_rows, not on the size of the dataset. A
+        ``dedup`` and ``neighbourhood_km`` only see the rows of a chunk. Specs with
+        ``drop_duplicates`` also drop rows duplicating a row of an earlier chunk,
+        one 64 bit hash per kept row is held for that.
+
+        Args:
+            chunk_rows (int, optional): Raw rows per chunk. Defaults to 100000.
+            **kwargs: Passed to process_data.
+
+        Yields:
+            DataFrame: cleaned chunk
+        """
+        drop_duplicates = self._drops_duplicates()
+        return_gde = kwargs.get("return_gde", False)
+        if drop_duplicates:
+            # Duplicates are judged on the gde range as well
+            kwargs["return_gde"] = True
+        seen = np.empty(0, dtype=np.uint64)
+        for chunk in self.dataset.iter_chunks(self.columns, chunk_rows):
+            cleaned = self.process_data(data=chunk, **kwargs)
+            if drop_duplicates:
+                hashes = pd.util.hash_pandas_object(cleaned, index=False).to_numpy()
+                new = ~np.isin(hashes, seen)
+                cleaned = cleaned[new]
+                seen = np.union1d(seen, hashes[new])
+                if not return_gde:
+                    cleaned = self._drop_gde(cleaned)
+            yield cleaned
+
+    def write_processed(self, path, chunk_rows=100000, **kwargs):
+        """Cleans the raw dataset chunk by chunk into a parquet file.
+
+        Args:
+            path (str): Output file.
+            chunk_rows (int, optional): Raw rows per chunk. Defaults to 100000.
+            **kwargs: Passed to process_data.
+
+        Returns:
+            int: number of rows written
+        """
+        return write_parquet_chunks(self.iter_process(chunk_rows, **kwargs), path)
@@ -0,0 +1,63 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .export import write_partitioned
+
+VARIANTS = ["clean", "clean_gde"]
+
+
+def _variant_columns(df, variant, gde):
+    if variant == "clean_gde":
+        return list(df.columns)
+    if variant == "clean":
+        first, last = gde
+        dropped = set(df.loc[:, first:last].columns)
+        return [c for c in df.columns if c not in dropped]
+    raise ValueError(
+        "Unknown variant {!r}, expected one of {}".format(variant, VARIANTS)
+    )
+
+
+def build(helper, outputs, data=None, **kwargs):
+    """Runs the cleaning once and writes every requested variant from the result.
+
+    The variants differ only by the gde columns of helper.PIPELINE, so they are
+    column selections of one process_data(return_gde=True) run. CSV files are
+    written with to_csv(columns=...), parquet files and partitioned parquet datasets
+    are selections of one shared Arrow table, so no variant copies the shared
+    columns.
+
+    Args:
+        helper (ImmoHelper): Helper of the dataset version.
+        outputs (dict): Variant name ("clean" or "clean_gde") per output path. Paths ending in .csv or .parquet are single files, paths without extension partitioned datasets (see export.write_partitioned).
+        data (DataFrame, optional): Uses helper.data if left default. Defaults to None.
+        **kwargs: Passed to process_data, e.g. kaggle=True.
+
+    Returns:
+        DataFrame: the clean_gde variant
+    """
+    df = helper.process_data(data=data, return_gde=True, **kwargs)
+    table = None
+    for path, variant in outputs.items():
+        columns = _variant_columns(df, variant, helper.PIPELINE.gde)
+        extension = os.path.splitext(path)[1]
+        if extension == ".csv":
+            df.to_csv(path, columns=columns)
+        elif extension in (".parquet", ""):
+            if table is None:
+                table = pa.Table.from_pandas(df, preserve_index=True)
+            index_columns = [
+                c
+                for c in table.schema.pandas_metadata["index_columns"]
+                if isinstance(c, str)
+            ]
+            selected = table.select(columns + index_columns)
+            if extension:
+                pq.write_table(selected, path)
+            else:
+                write_partitioned(selected, path)
+        else:
+            raise ValueError("Unsupported output format {!r}".format(path))
+    return df
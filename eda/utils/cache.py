@@ -0,0 +1,206 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "IMMO_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "immo")
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("IMMO_CACHE_MAX_BYTES", 4 * 1024**3))
+
+_CHUNK_SIZE = 1024**2
+
+
+def _is_remote(url):
+    return urllib.parse.urlparse(str(url)).scheme in ("http", "https")
+
+
+def file_sha256(path):
+    """Returns the hex sha256 of the file at ``path``."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class DatasetCache(object):
+    """Content-addressed on-disk store for the remote datasets.
+
+    Every download is stored once under ``objects/<sha256><ext>`` and an index maps
+    each URL to the hash of its content. URLs that resolve to identical files share
+    one object. The least recently used objects are evicted once the store grows
+    beyond ``max_bytes``. Updates of the index are serialised with a file lock, so
+    processes sharing the cache do not lose each other's entries.
+
+    Args:
+        root (str, optional): Cache directory. Defaults to $IMMO_CACHE_DIR or ~/.cache/immo.
+        max_bytes (int, optional): Size limit of the stored objects. Defaults to $IMMO_CACHE_MAX_BYTES or 4 GiB.
+        offline (bool, optional): Never touch the network, fail on cache misses. Defaults to $IMMO_OFFLINE.
+    """
+
+    def __init__(self, root=None, max_bytes=None, offline=None):
+        self.root = root or DEFAULT_CACHE_DIR
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        if offline is None:
+            offline = os.environ.get("IMMO_OFFLINE", "") not in ("", "0")
+        self.offline = offline
+        self._objects = os.path.join(self.root, "objects")
+        self._index_path = os.path.join(self.root, "index.json")
+        os.makedirs(self._objects, exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        # Serialises the read-modify-write of the index between processes
+        with open(os.path.join(self.root, "index.lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, self._index_path)
+
+    def _object_path(self, entry):
+        return os.path.join(self._objects, entry["sha256"] + entry["ext"])
+
+    def _download(self, url):
+        ext = os.path.splitext(urllib.parse.urlparse(url).path)[1]
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f, urllib.request.urlopen(url) as response:
+                for chunk in iter(lambda: response.read(_CHUNK_SIZE), b""):
+                    sha.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            entry = {"sha256": sha.hexdigest(), "ext": ext, "size": size}
+            os.replace(tmp, self._object_path(entry))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return entry
+
+    def path(self, url, refresh=False, verify=False):
+        """Returns the local path of ``url``, downloading it if needed.
+
+        Args:
+            url (str): Remote URL. Local paths are returned unchanged.
+            refresh (bool, optional): Download again even if the URL is cached. Defaults to False.
+            verify (bool, optional): Rehash the cached file and download again if it is corrupted. Defaults to False.
+
+        Returns:
+            str: path to the cached file
+        """
+        if not _is_remote(url):
+            return url
+
+        with self._locked():
+            entry = self._load_index().get(url)
+            if entry is not None and not os.path.exists(self._object_path(entry)):
+                entry = None
+            if (
+                entry is not None
+                and verify
+                and file_sha256(self._object_path(entry)) != entry["sha256"]
+            ):
+                os.remove(self._object_path(entry))
+                entry = None
+            if entry is not None and not refresh:
+                return self._object_path(self._store(url, entry))
+
+        if self.offline:
+            if entry is None:
+                raise FileNotFoundError(
+                    "{} is not cached and offline mode is enabled".format(url)
+                )
+        else:
+            # Outside the lock, objects are written atomically under their hash
+            entry = self._download(url)
+        with self._locked():
+            return self._object_path(self._store(url, entry))
+
+    def _store(self, url, entry):
+        # Records entry for url in the index on disk, called with the lock held
+        index = self._load_index()
+        previous = index.get(url)
+        entry = dict(entry, atime=time.time())
+        index[url] = entry
+        if previous is not None:
+            # A refreshed URL can leave its old content without any index entry
+            self._remove_unreferenced(index, previous)
+        self._evict(index, keep=entry["sha256"])
+        self._save_index(index)
+        return entry
+
+    def _remove_unreferenced(self, index, entry):
+        path = self._object_path(entry)
+        referenced = any(self._object_path(e) == path for e in index.values())
+        if not referenced and os.path.exists(path):
+            os.remove(path)
+
+    def _evict(self, index, keep=None):
+        objects = {}
+        for url, entry in index.items():
+            last = objects.get(entry["sha256"])
+            if last is None or entry["atime"] > last["atime"]:
+                objects[entry["sha256"]] = entry
+        total = sum(entry["size"] for entry in objects.values())
+        for entry in sorted(objects.values(), key=lambda e: e["atime"]):
+            if total <= self.max_bytes:
+                break
+            if entry["sha256"] == keep:
+                continue
+            if os.path.exists(self._object_path(entry)):
+                os.remove(self._object_path(entry))
+            total -= entry["size"]
+            for url in [u for u, e in index.items() if e["sha256"] == entry["sha256"]]:
+                del index[url]
+
+    def clear(self):
+        """Removes all cached files."""
+        with self._locked():
+            for entry in self._load_index().values():
+                if os.path.exists(self._object_path(entry)):
+                    os.remove(self._object_path(entry))
+            self._save_index({})
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Returns the process wide DatasetCache configured from the environment."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DatasetCache()
+    return _default_cache
+
+
+def cached_path(url, refresh=False, verify=False):
+    """Shortcut for ``get_cache().path(url, refresh, verify)``."""
+    return get_cache().path(url, refresh=refresh, verify=verify)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+
+def _present(column, empty_as_missing):
+    present = column.notna().to_numpy()
+    if empty_as_missing and not pd.api.types.is_numeric_dtype(column.dtype):
+        # Empty or whitespace strings, checked once per distinct value
+        codes, uniques = pd.factorize(column)
+        blank = np.array(
+            [isinstance(x, str) and not x.strip() for x in uniques] + [False]
+        )
+        present = present & ~blank[codes]
+    return present
+
+
+def coalesce(data, sources, name=None, empty_as_missing=False):
+    """Takes per row the first non-missing value of the ``sources`` columns.
+
+    Equivalent to ``data[a].fillna(data[b]).fillna(data[c])``, but the source of
+    every row is resolved first from the missing-value masks, each column is then
+    copied once into the selected rows, and the sources are reported as well.
+
+    Args:
+        data (DataFrame): Input data, or a dict of equally indexed Series.
+        sources (list): Column names in order of priority.
+        name (str, optional): Name of the returned Series. Defaults to None.
+        empty_as_missing (bool, optional): Empty or whitespace strings count as missing. Defaults to False.
+
+    Returns:
+        tuple: (Series of values, categorical Series of source column names, NaN where every source is missing)
+    """
+    columns = [data[source] for source in sources]
+    # Position of the first present source per row, -1 if all are missing
+    chosen = np.full(len(columns[0]), -1, dtype=np.int8)
+    for i in reversed(range(len(columns))):
+        chosen[_present(columns[i], empty_as_missing)] = i
+
+    numeric = all(
+        pd.api.types.is_numeric_dtype(column.dtype)
+        and not pd.api.types.is_bool_dtype(column.dtype)
+        for column in columns
+    )
+    values = np.full(len(chosen), np.nan, dtype=float if numeric else object)
+    for i, column in enumerate(columns):
+        selected = chosen == i
+        if numeric:
+            column = column.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            column = column.to_numpy(dtype=object)
+        values[selected] = column[selected]
+
+    index = columns[0].index
+    source = pd.Categorical.from_codes(chosen, categories=list(sources))
+    return (
+        pd.Series(values, index=index, name=name, dtype=values.dtype),
+        pd.Series(source, index=index, name=name),
+    )
+
+
+def coalesce_all(data, spec):
+    """Runs coalesce for every feature of a spec.
+
+    Args:
+        data (DataFrame): Input data.
+        spec (dict): Ordered source columns per feature, e.g. specs.V2.coalesce.
+
+    Returns:
+        tuple: (DataFrame of merged features, DataFrame of their source columns)
+    """
+    values, sources = {}, {}
+    for feature, columns in spec.items():
+        values[feature], sources[feature] = coalesce(data, columns, name=feature)
+    return (
+        pd.DataFrame(values, index=data.index),
+        pd.DataFrame(sources, index=data.index),
+    )
@@ -0,0 +1,152 @@
+import pandas as pd
+
+
+class LazyDataset(object):
+    """Column-projected view of a raw dataset file.
+
+    Only the schema is read on construction. Columns are read on first access and
+    kept in memory, so asking for extra columns later only reads those columns.
+
+    Args:
+        path (str): Local path or URL of the file.
+        type (str, optional): "parquet" or "csv". Defaults to "parquet".
+        dtype (dict, optional): dtypes passed to read_csv, keeps chunks consistent. Defaults to None.
+    """
+
+    def __init__(self, path, type="parquet", dtype=None):
+        self.path = path
+        self.type = type
+        self.dtype = dtype
+        self._frame = None
+        if type == "parquet":
+            import pyarrow.parquet as pq
+
+            names = pq.read_schema(path).names
+            self.columns = [c for c in names if not c.startswith("__index_level_")]
+        if type == "csv":
+            self.columns = list(pd.read_csv(path, nrows=0).columns)
+
+    def __getstate__(self):
+        # Loaded columns are not sent to worker processes
+        state = self.__dict__.copy()
+        state["_frame"] = None
+        return state
+
+    def resolve(self, columns=(), ranges=(), positions=()):
+        """Translates a column declaration into column names in file order.
+
+        Args:
+            columns (list, optional): Column names, names missing in the file are ignored. Defaults to ().
+            ranges (list, optional): (first, last) tuples of inclusive column ranges. Defaults to ().
+            positions (list, optional): Column positions. Defaults to ().
+
+        Returns:
+            list: column names
+        """
+        wanted = set(c for c in columns if c in self.columns)
+        wanted.update(self.columns[p] for p in positions)
+        for first, last in ranges:
+            start, stop = self.columns.index(first), self.columns.index(last)
+            wanted.update(self.columns[start : stop + 1])
+        return [c for c in self.columns if c in wanted]
+
+    def read(self, columns=None):
+        """Reads the given columns from the file without keeping them in memory.
+
+        Args:
+            columns (list, optional): Column names. Uses all columns of the file if left default. Defaults to None.
+
+        Returns:
+            DataFrame: requested columns
+        """
+        if columns is None:
+            columns = self.columns
+        if self.type == "parquet":
+            return pd.read_parquet(self.path, columns=columns)
+        if self.type == "csv":
+            return pd.read_csv(
+                self.path, usecols=columns, dtype=self.dtype, low_memory=False
+            )
+
+    def load(self, columns=None):
+        """Returns the given columns, reading the ones not loaded yet.
+
+        Args:
+            columns (list, optional): Column names. Uses all columns of the file if left default. Defaults to None.
+
+        Returns:
+            DataFrame: requested columns in file order
+        """
+        if columns is None:
+            columns = self.columns
+        if self._frame is None:
+            self._frame = self.read(columns)
+        else:
+            missing = [c for c in columns if c not in self._frame.columns]
+            if missing:
+                extra = self.read(missing)
+                extra.index = self._frame.index
+                loaded = set(self._frame.columns).union(missing)
+                self._frame = pd.concat([self._frame, extra], axis=1)[
+                    [c for c in self.columns if c in loaded]
+                ]
+        selected = [c for c in self.columns if c in set(columns)]
+        if selected == list(self._frame.columns):
+            return self._frame
+        return self._frame[selected]
+
+    def iter_chunks(self, columns=None, chunk_rows=100000):
+        """Reads the given columns in chunks without keeping them in memory.
+
+        Parquet files are read batch by batch and CSV files with read_csv(chunksize).
+        Chunks carry the same index as a full read of the file.
+
+        Args:
+            columns (list, optional): Column names. Uses all columns of the file if left default. Defaults to None.
+            chunk_rows (int, optional): Maximum rows per chunk. Defaults to 100000.
+
+        Yields:
+            DataFrame: next chunk of rows
+        """
+        if columns is None:
+            columns = self.columns
+        if self.type == "parquet":
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(self.path)
+            # Index columns stored by pandas, a RangeIndex is stored as metadata only
+            pandas_metadata = parquet_file.schema_arrow.pandas_metadata or {}
+            index_columns = [
+                c
+                for c in pandas_metadata.get("index_columns", [])
+                if isinstance(c, str)
+            ]
+            offset = 0
+            for batch in parquet_file.iter_batches(
+                batch_size=chunk_rows, columns=list(columns) + index_columns
+            ):
+                chunk = batch.to_pandas()
+                if index_columns:
+                    chunk = chunk.set_index(index_columns)
+                    chunk.index.names = [
+                        None if n.startswith("__index_level_") else n
+                        for n in chunk.index.names
+                    ]
+                else:
+                    chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                offset += len(chunk)
+                yield chunk
+        if self.type == "csv":
+            for chunk in pd.read_csv(
+                self.path,
+                usecols=columns,
+                dtype=self.dtype,
+                chunksize=chunk_rows,
+                low_memory=False,
+            ):
+                yield chunk
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.load([key])[key]
+        return self.load(list(key))
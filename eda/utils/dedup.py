@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+# Blocks of candidate duplicates: same address, or same rounded coordinates
+ADDRESS_KEYS = ["zip_code", "street", "street_nr"]
+GEO_KEYS = ["Latitude", "Longitude"]
+# Spellings of "street" reduced to one form before comparing addresses
+STREET_ABBREVIATIONS = {r"stra(?:ss|ß)e\b": "str", r"str\.": "str"}
+
+
+def normalize_street(series):
+    """Lowercases street names and unifies the spellings of "strasse".
+
+    Runs on the unique values only.
+
+    Args:
+        series (Series): Street names, or street numbers.
+
+    Returns:
+        Series: normalized values, missing values stay missing
+    """
+    codes, uniques = pd.factorize(series)
+    normalized = pd.Series(uniques, dtype=object).astype(str).str.lower()
+    for pattern, replacement in STREET_ABBREVIATIONS.items():
+        normalized = normalized.str.replace(pattern, replacement, regex=True)
+    normalized = normalized.str.replace(r"[^0-9a-zäöüéèà]", "", regex=True)
+    values = normalized.to_numpy(dtype=object)[codes]
+    values[codes < 0] = None
+    return pd.Series(values, index=series.index, dtype=object)
+
+
+def _block(keys):
+    # Block number per row, -1 where a key is missing
+    valid = keys.notna().all(axis=1).to_numpy()
+    block = keys.groupby(list(keys.columns), dropna=False, sort=False).ngroup()
+    return np.where(valid, block.to_numpy(), -1)
+
+
+def _neighbour_pairs(block, rooms, space, tolerance):
+    # Sorted neighbourhood: within a block, rows sorted by rooms and living space
+    # are only compared to the next row
+    rows = np.flatnonzero(block >= 0)
+    rows = rows[np.lexsort((space[rows], rooms[rows], block[rows]))]
+    a, b = rows[:-1], rows[1:]
+    same_rooms = (rooms[a] == rooms[b]) | (np.isnan(rooms[a]) & np.isnan(rooms[b]))
+    close = np.abs(space[a] - space[b]) <= tolerance * np.fmax(space[a], space[b])
+    close |= np.isnan(space[a]) & np.isnan(space[b])
+    match = (block[a] == block[b]) & same_rooms & close
+    return a[match], b[match]
+
+
+def _components(n, a, b):
+    # Union-find on arrays: hook roots to the smaller root, then compress paths
+    labels = np.arange(n)
+    while True:
+        la, lb = labels[a], labels[b]
+        if (la == lb).all():
+            return labels
+        low = np.minimum(la, lb)
+        np.minimum.at(labels, la, low)
+        np.minimum.at(labels, lb, low)
+        while True:
+            parents = labels[labels]
+            if (parents == labels).all():
+                break
+            labels = parents
+
+
+def duplicate_groups(data, precision=4, tolerance=0.02):
+    """Groups listings describing the same property.
+
+    Candidates are only compared within blocks: listings with the same normalized
+    zip code, street and street number, or with the same Latitude and Longitude
+    rounded to ``precision`` decimals. Within a block two listings match if their
+    rooms are equal and their living spaces differ by at most ``tolerance``. A
+    value missing in both listings counts as equal, one missing on one side only
+    never matches. Matches are chained, so the groups are the connected components.
+
+    Args:
+        data (DataFrame): Cleaned data, e.g. process_data(return_gde=True).
+        precision (int, optional): Decimals of the coordinates, 4 is about 10 m. Defaults to 4.
+        tolerance (float, optional): Relative difference of the living spaces. Defaults to 0.02.
+
+    Returns:
+        ndarray: position of the first row of its group per row
+    """
+    n = len(data)
+
+    def numbers(column):
+        if column not in data:
+            return np.full(n, np.nan)
+        return pd.to_numeric(data[column], errors="coerce").to_numpy(
+            dtype=float, na_value=np.nan
+        )
+
+    rooms, space = numbers("rooms"), numbers("living_space")
+    pairs = []
+    if all(c in data for c in ADDRESS_KEYS):
+        keys = pd.DataFrame(
+            {
+                "zip_code": data["zip_code"],
+                "street": normalize_street(data["street"]),
+                "street_nr": normalize_street(data["street_nr"]),
+            }
+        )
+        pairs.append(_neighbour_pairs(_block(keys), rooms, space, tolerance))
+    if all(c in data for c in GEO_KEYS):
+        keys = pd.DataFrame({c: numbers(c).round(precision) for c in GEO_KEYS})
+        pairs.append(_neighbour_pairs(_block(keys), rooms, space, tolerance))
+    if not pairs:
+        return np.arange(n)
+    a = np.concatenate([p[0] for p in pairs])
+    b = np.concatenate([p[1] for p in pairs])
+    return _components(n, a, b)
+
+
+def find_duplicates(data, precision=4, tolerance=0.02):
+    """Marks listings that duplicate an earlier listing, see duplicate_groups.
+
+    Args:
+        data (DataFrame): Cleaned data.
+        precision (int, optional): Decimals of the coordinates. Defaults to 4.
+        tolerance (float, optional): Relative difference of the living spaces. Defaults to 0.02.
+
+    Returns:
+        Series: index label of the first listing of the group, missing for first listings
+    """
+    groups = duplicate_groups(data, precision, tolerance)
+    first = pd.Series(data.index[groups], index=data.index, name="duplicate_of")
+    if pd.api.types.is_integer_dtype(first):
+        first = first.astype("Int64")
+    return first.where(groups != np.arange(len(data)))
+
+
+def deduplicate(data, how="collapse", precision=4, tolerance=0.02):
+    """Marks or collapses duplicate listings, see duplicate_groups.
+
+    Args:
+        data (DataFrame): Cleaned data.
+        how (str, optional): "mark" adds the column duplicate_of (see find_duplicates), "collapse" keeps one row per group, completed with the first non-missing values of the other rows. Defaults to "collapse".
+        precision (int, optional): Decimals of the coordinates. Defaults to 4.
+        tolerance (float, optional): Relative difference of the living spaces. Defaults to 0.02.
+
+    Returns:
+        DataFrame: data with duplicate_of, or one row per group in the order of the first rows
+    """
+    if how == "mark":
+        return data.assign(duplicate_of=find_duplicates(data, precision, tolerance))
+    if how != "collapse":
+        raise ValueError("how must be 'mark' or 'collapse', not {!r}".format(how))
+
+    groups = duplicate_groups(data, precision, tolerance)
+    grouped = np.bincount(groups, minlength=len(data))[groups] > 1
+    single = np.flatnonzero(~grouped)
+    merged = data[grouped].groupby(groups[grouped], sort=True).first()
+    # first() keeps the group number, the position of the group's first row
+    positions = merged.index.to_numpy()
+    merged.index = data.index[positions]
+    collapsed = pd.concat([data.iloc[single], merged])
+    order = np.argsort(np.concatenate([single, positions]), kind="stable")
+    return collapsed.iloc[order]
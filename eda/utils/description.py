@@ -0,0 +1,101 @@
+import re
+
+from .parsers import map_unique_records
+
+# Fused pattern of the description layout, every part is optional:
+# "3.5 rooms, 100 m²«Luxuriöse Attika-Wohnung»CHF 1,100,000.—Favourite"
+DESCRIPTION = re.compile(
+    r"^\s*(?:(?P<rooms>\d+(?:\.\d+)?) *rooms?,? *)?"
+    r"(?:(?P<living_space>\d[\d,']*) *m²)? *"
+    r"(?:«(?P<title>.*)»)? *"
+    r"(?:CHF *(?P<price>\d[\d,']*))?",
+    re.S,
+)
+
+# Words of the title per type, in German, French, Italian and English. All types
+# are one alternation: the leftmost word wins, at the same position the type listed
+# first, so "Attika-Wohnung" is a penthouse and "Wohnung im Mehrfamilienhaus" a flat.
+TYPE_KEYWORDS = [
+    ("penthouse", ["penthouse", "attika", "attico", "attique"]),
+    ("attic-flat", ["dachwohnung", "dachgeschosswohnung", "mansarde", "combles"]),
+    ("duplex-maisonette", ["maisonette", "duplex"]),
+    ("loft", ["loft"]),
+    ("studio", ["studio", "monolocale"]),
+    ("stepped-house", ["terrassenhaus"]),
+    (
+        "terrace-house",
+        [
+            "reihenhaus",
+            "reiheneinfamilienhaus",
+            "maison mitoyenne",
+            "mitoyenne",
+            "casa a schiera",
+            "schiera",
+        ],
+    ),
+    (
+        "semi-detached-house",
+        ["doppelhaus", "doppeleinfamilienhaus", "maison jumel", "jumel"],
+    ),
+    ("villa", ["villa"]),
+    ("chalet", ["chalet"]),
+    ("rustico", ["rustico"]),
+    ("farmhouse", ["bauernhaus", "ferme", "cascina", "farmhouse"]),
+    ("detached-house", ["einfamilienhaus", "haus", "maison", "casa", "house"]),
+    ("flat", ["wohnung", "appartement", "apartment", "appartamento", "flat"]),
+]
+_TYPE = re.compile(
+    "|".join(
+        "(?P<{}>{})".format(label.replace("-", "_"), "|".join(words))
+        for label, words in TYPE_KEYWORDS
+    ),
+    re.IGNORECASE,
+)
+FIELDS = ["rooms", "living_space", "price", "type"]
+
+
+def _number(x):
+    return None if x is None else float(re.sub(r"[,']", "", x))
+
+
+def parse_description_value(x):
+    """Parses a single description, see parse_description.
+
+    Args:
+        x (str): Description.
+
+    Returns:
+        dict: rooms, living_space, price (floats) and type, None for missing fields
+    """
+    fields = DESCRIPTION.match(x).groupdict()
+    # Free text without the «title» is searched as a whole
+    title = fields["title"] if fields["title"] is not None else x
+    match = _TYPE.search(title)
+    return {
+        "rooms": _number(fields["rooms"]),
+        "living_space": _number(fields["living_space"]),
+        "price": _number(fields["price"]),
+        "type": match.lastgroup.replace("_", "-") if match else None,
+    }
+
+
+def parse_description(series):
+    """Extracts rooms, living space, price and type from descriptions.
+
+    Replaces one ``str.extract`` per quantity, e.g.
+    ``df["description"].str.extract("(\\d+) m²«")``: every distinct description is
+    matched once against one fused pattern, and the type is searched in the title
+    with one alternation of all type keywords.
+
+    Args:
+        series (Series): Descriptions.
+
+    Returns:
+        DataFrame: rooms, living_space and price as float, type as object
+    """
+    parsed = map_unique_records(
+        series, lambda x: tuple(parse_description_value(x).values()), FIELDS
+    )
+    for field in ["rooms", "living_space", "price"]:
+        parsed[field] = parsed[field].astype(float)
+    return parsed
@@ -0,0 +1,93 @@
+import ast
+import re
+
+import numpy as np
+
+from .parsers import map_unique, map_unique_dicts
+
+_ROOMS = re.compile(r"(\d+\.?\d?) rooms")
+
+
+def _flatten(details, prefix=""):
+    # Nested dicts become "outer.inner" keys, like pd.json_normalize
+    flat = {}
+    for key, value in details.items():
+        key = prefix + str(key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, key + "."))
+        else:
+            flat[key] = value
+    return flat
+
+
+def _literal(x):
+    # The parsed dict, None for malformed values
+    try:
+        details = ast.literal_eval(x)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+    return details if isinstance(details, dict) else None
+
+
+def parse_details_value(x):
+    """Parses a single details_structured string, a python dict literal.
+
+    Uses ast.literal_eval, so the string is never executed.
+
+    Args:
+        x (str): details_structured value.
+
+    Returns:
+        dict: flat key to value mapping, empty for malformed values
+    """
+    details = _literal(x)
+    return {} if details is None else _flatten(details)
+
+
+def _parse(x):
+    return parse_details_value(x) if isinstance(x, str) else {}
+
+
+def parse_details(series, keys=None):
+    """Expands details_structured into one column per key.
+
+    Replaces ``pd.json_normalize(series.apply(eval))``: every distinct string is
+    parsed once and each column is gathered from the parsed uniques in one take.
+
+    Args:
+        series (Series): details_structured values.
+        keys (list, optional): Keys to extract. Uses every key found, in order of first appearance, if left default. Defaults to None.
+
+    Returns:
+        DataFrame: one object column per key with the index of ``series``, NaN for missing keys
+    """
+    return map_unique_dicts(series, _parse, keys)
+
+
+def _rooms_value(x):
+    if not isinstance(x, str):
+        return np.nan
+    details = _literal(x)
+    # Malformed values, e.g. truncated by the scraper, are searched as a whole
+    values = [x] if details is None else _flatten(details).values()
+    for value in values:
+        if isinstance(value, str):
+            match = _ROOMS.search(value)
+            if match:
+                return float(match.group(1))
+    return np.nan
+
+
+def parse_rooms(series):
+    """Extracts the number of rooms ("3.5 rooms") from details_structured.
+
+    The first value mentioning rooms wins, in practice the description. Values that
+    are not a valid dict literal are searched as a whole.
+
+    Args:
+        series (Series): details_structured values.
+
+    Returns:
+        Series: rooms as float
+    """
+    return map_unique(series, _rooms_value)
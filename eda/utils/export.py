@@ -0,0 +1,120 @@
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .schema import apply_schema
+
+# Consumers usually need one canton or one property type
+PARTITION_COLUMNS = ["canton", "type"]
+
+
+def _writer_type(type):
+    # Columns that are all missing in the first chunk hold strings in later chunks
+    if pa.types.is_null(type):
+        return pa.string()
+    # Categories and their index width differ from chunk to chunk
+    if pa.types.is_dictionary(type):
+        return pa.dictionary(pa.int32(), _writer_type(type.value_type))
+    return type
+
+
+def _writer_schema(table):
+    return pa.schema(
+        [field.with_type(_writer_type(field.type)) for field in table.schema],
+        metadata=table.schema.metadata,
+    )
+
+
+def write_parquet_chunks(chunks, path):
+    """Writes DataFrame chunks into one parquet file as they arrive.
+
+    Only one chunk is held in memory at a time, every chunk becomes one row group.
+
+    Args:
+        chunks (iterable): DataFrames with the same columns.
+        path (str): Output file.
+
+    Returns:
+        int: number of rows written
+    """
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(path, _writer_schema(table))
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_partitioned(
+    data, root, partition_cols=PARTITION_COLUMNS, row_group_size=64 * 1024
+):
+    """Writes cleaned data as a hive partitioned parquet dataset.
+
+    Creates one directory per partition value (root/canton=ZH/type=flat/...) and
+    files with row group statistics, so readers skip partitions and row groups that
+    cannot match a filter. Existing partitions that are written again are replaced.
+
+    Args:
+        data (DataFrame or Table): cleaned data, the index is kept
+        root (str): Output directory.
+        partition_cols (list, optional): Partition columns. Defaults to PARTITION_COLUMNS.
+        row_group_size (int, optional): Maximum rows per row group. Defaults to 65536.
+    """
+    table = data
+    if not isinstance(data, pa.Table):
+        table = pa.Table.from_pandas(data, preserve_index=True)
+    # Partition values are plain strings in the directory names
+    for column in partition_cols:
+        position = table.schema.get_field_index(column)
+        table = table.set_column(
+            position, column, table.column(column).cast(pa.string())
+        )
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=partition_cols,
+        partitioning_flavor="hive",
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, 1024),
+        existing_data_behavior="delete_matching",
+    )
+
+
+def read_partitioned(root, columns=None, filter=None, **equals):
+    """Reads a subset of a dataset written by write_partitioned.
+
+    Equality conditions on partition columns only open the matching directories,
+    other conditions are pushed down to the row group statistics.
+
+    Args:
+        root (str): Dataset directory.
+        columns (list, optional): Columns to read. Uses all columns if left default. Defaults to None.
+        filter (Expression, optional): Additional pyarrow.dataset filter, e.g. ds.field("price") < 1e6. Defaults to None.
+        **equals: Column value or list of values, e.g. canton="ZH" or type=["flat", "attic-flat"].
+
+    Returns:
+        DataFrame: matching rows with the cleaned schema
+    """
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    for column, value in equals.items():
+        if isinstance(value, (list, tuple, set)):
+            condition = ds.field(column).isin(list(value))
+        else:
+            condition = ds.field(column) == value
+        filter = condition if filter is None else filter & condition
+    if columns is not None:
+        index_columns = [
+            c
+            for c in (dataset.schema.pandas_metadata or {}).get("index_columns", [])
+            if isinstance(c, str)
+        ]
+        columns = list(columns) + index_columns
+    return apply_schema(dataset.to_table(columns=columns, filter=filter).to_pandas())
@@ -0,0 +1,170 @@
+import glob
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .schema import apply_schema
+
+_KEY = "__key__"
+_FINGERPRINT = "__fingerprint__"
+_METADATA = b"immo_incremental"
+
+
+def fingerprint(data, index=False):
+    """Returns one uint64 hash per row over all columns of ``data``.
+
+    Args:
+        data (DataFrame): Raw data.
+        index (bool, optional): Include the index in the hash. Defaults to False.
+
+    Returns:
+        ndarray: hashes
+    """
+    return pd.util.hash_pandas_object(data, index=index).to_numpy()
+
+
+def code_version(helper):
+    """Returns a hash of the cleaning code of ``helper``: its module and eda/utils.
+
+    Args:
+        helper (ImmoHelper): Helper of the dataset version.
+
+    Returns:
+        str: hex digest, changes with every edit of a spec, parser or helper
+    """
+    utils = os.path.dirname(os.path.abspath(__file__))
+    files = sorted(glob.glob(os.path.join(utils, "*.py")))
+    files.append(inspect.getsourcefile(type(helper)))
+    digest = hashlib.sha256()
+    for path in files:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class IncrementalStore(object):
+    """Local store of cleaned rows, so reruns only clean new or changed listings.
+
+    Every cleaned row is stored under the index process_data gave it, together with
+    the identity of its listing and a fingerprint of the raw columns and index the
+    pipeline read. On the next run rows whose fingerprint is unchanged are taken
+    from the store and only the remaining rows go through process_data. Listings
+    missing from the new raw data are dropped. The store is rebuilt when the
+    arguments of process_data or the cleaning code change.
+
+    Only row independent cleaning can be reused: ``dedup``, ``neighbourhood_km``
+    and specs with ``drop_duplicates`` depend on the other rows and are rejected.
+
+    Args:
+        path (str): Parquet file holding the store.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = None
+
+    def _load(self, config):
+        if not os.path.exists(self.path):
+            return None
+        table = pq.read_table(self.path)
+        metadata = table.schema.metadata or {}
+        # Stored rows are only valid for the same process_data arguments and code
+        if json.loads(metadata.get(_METADATA, b"null")) != config:
+            return None
+        return table.to_pandas()
+
+    def _save(self, cleaned, keys, fingerprints, config):
+        table = pa.Table.from_pandas(
+            cleaned.assign(**{_KEY: keys, _FINGERPRINT: fingerprints}),
+            preserve_index=True,
+        )
+        metadata = dict(table.schema.metadata or {})
+        metadata[_METADATA] = json.dumps(config).encode()
+        table = table.replace_schema_metadata(metadata)
+        tmp = self.path + ".tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, self.path)
+
+    def process(self, helper, data=None, key=None, **kwargs):
+        """Cleans ``data`` with helper.process_data, reusing unchanged stored rows.
+
+        Args:
+            helper (ImmoHelper): Helper of the dataset version.
+            data (DataFrame, optional): Uses helper.data if left default. Defaults to None.
+            key (str, optional): Column identifying a listing. Uses the index if left default. Defaults to None.
+            **kwargs: Passed to process_data.
+
+        Returns:
+            DataFrame: tidy DataFrame in the row order of ``data``
+        """
+        if kwargs.get("dedup") or kwargs.get("neighbourhood_km"):
+            raise ValueError(
+                "dedup and neighbourhood_km depend on the other rows and can not be reused"
+            )
+        if getattr(helper.PIPELINE, "drop_duplicates", False):
+            raise ValueError(
+                "{} drops duplicate rows, its rows can not be reused".format(
+                    type(helper).__module__
+                )
+            )
+        if data is None:
+            data = helper.data
+        keys = data.index if key is None else pd.Index(data[key])
+        if not keys.is_unique:
+            raise ValueError("Listing keys must be unique")
+        # The output index of some helpers is derived from the raw index
+        fingerprints = fingerprint(data, index=True)
+        # The tracer only observes the run, it does not change the cleaned rows
+        options = {k: v for k, v in kwargs.items() if k != "tracer"}
+        config = {
+            "helper": type(helper).__module__,
+            "code": code_version(helper),
+            "kwargs": options,
+        }
+
+        unchanged = np.zeros(len(data), dtype=bool)
+        removed = 0
+        stored = self._load(config)
+        if stored is not None:
+            positions = pd.Index(stored.pop(_KEY)).get_indexer(keys)
+            stored_fingerprints = stored.pop(_FINGERPRINT).to_numpy()
+            known = positions >= 0
+            unchanged[known] = (
+                stored_fingerprints[positions[known]] == fingerprints[known]
+            )
+            removed = len(stored) - int(known.sum())
+            # Stored rows keep the index process_data gave them
+            parts = [stored.iloc[positions[unchanged]]]
+        else:
+            parts = []
+
+        changed = ~unchanged
+        if changed.any() or not parts:
+            processed = helper.process_data(data=data[changed], **kwargs)
+            if len(processed) != changed.sum():
+                raise ValueError(
+                    "process_data returned {} rows for {} listings".format(
+                        len(processed), changed.sum()
+                    )
+                )
+            parts.append(processed)
+        # Restore the row order of data
+        order = np.argsort(
+            np.concatenate([np.flatnonzero(unchanged), np.flatnonzero(changed)]),
+            kind="stable",
+        )
+        cleaned = apply_schema(pd.concat(parts).iloc[order])
+
+        self.stats = {
+            "reused": int(unchanged.sum()),
+            "processed": int(changed.sum()),
+            "removed": removed,
+        }
+        self._save(cleaned, keys, fingerprints, config)
+        return cleaned
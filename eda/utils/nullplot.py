@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from .profiles import Profile
+
+try:
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+
+def _null_masks(data):
+    # (column names, rows, iterator of one boolean null mask per column)
+    if isinstance(data, Profile):
+        return data.columns, data.rows, (data.null_mask(c) for c in data.columns)
+    if isinstance(data, pd.DataFrame):
+        masks = (data.iloc[:, j].isna().to_numpy() for j in range(data.shape[1]))
+        return list(data.columns), len(data), masks
+    data = np.asarray(data, dtype=bool)
+    return list(range(data.shape[1])), len(data), iter(data.T)
+
+
+def null_bins(data, bins=200):
+    """Aggregates the null mask of ``data`` into row bins.
+
+    Only one column mask is held at a time, so memory and plotting cost depend on
+    ``bins`` and the number of columns, not on the number of rows.
+
+    Args:
+        data (DataFrame): Data, a Profile or a boolean null mask of shape (rows, columns).
+        bins (int, optional): Number of row bins, at most one per row. Defaults to 200.
+
+    Returns:
+        DataFrame: share of missing values per bin (index: first row of the bin) and column
+    """
+    names, rows, masks = _null_masks(data)
+    bins = max(1, min(bins, rows))
+    edges = np.linspace(0, rows, bins + 1).astype(np.int64)
+    shares = np.zeros((bins, len(names)))
+    if rows:
+        sizes = np.diff(edges)
+        for j, mask in enumerate(masks):
+            shares[:, j] = np.add.reduceat(mask, edges[:-1], dtype=np.int64) / sizes
+    return pd.DataFrame(shares, index=edges[:-1], columns=names)
+
+
+def null_patterns(data, top=None):
+    """Groups the rows of ``data`` by their null pattern.
+
+    The masks are packed to one bit per cell before the identical patterns are
+    counted.
+
+    Args:
+        data (DataFrame): Data, a Profile or a boolean null mask of shape (rows, columns).
+        top (int, optional): Keep only the most frequent patterns. Defaults to None (all).
+
+    Returns:
+        tuple: (DataFrame of boolean patterns, True where missing; Series of the row count per pattern), most frequent first
+    """
+    names, rows, masks = _null_masks(data)
+    packed = np.zeros((rows, -(-len(names) // 8)), dtype=np.uint8)
+    for j, mask in enumerate(masks):
+        packed[:, j // 8] |= mask.view(np.uint8) << np.uint8(7 - j % 8)
+    unique, counts = np.unique(packed, axis=0, return_counts=True)
+    order = np.argsort(-counts, kind="stable")[:top]
+    patterns = np.unpackbits(unique[order], axis=1, count=len(names)).astype(bool)
+    return (
+        pd.DataFrame(patterns, columns=names),
+        pd.Series(counts[order], name="rows"),
+    )
+
+
+def _require_matplotlib():
+    if plt is None:
+        raise ImportError("Plotting the null patterns requires matplotlib")
+
+
+def plot_nulls(data, bins=200, ax=None, cbar=False):
+    """Draws the missing values of ``data`` like sns.heatmap(data.isna()), binned by rows.
+
+    Args:
+        data (DataFrame): Data, a Profile or a boolean null mask.
+        bins (int, optional): Row bins, i.e. the vertical resolution. Defaults to 200.
+        ax (Axes, optional): Axes to draw on. Defaults to the current axes.
+        cbar (bool, optional): Draw a color bar of the missing share. Defaults to False.
+
+    Returns:
+        Axes: the heatmap
+    """
+    _require_matplotlib()
+    shares = null_bins(data, bins)
+    ax = ax or plt.gca()
+    image = ax.imshow(
+        shares.to_numpy(),
+        aspect="auto",
+        interpolation="nearest",
+        cmap="Greys",
+        vmin=0,
+        vmax=1,
+    )
+    ax.set_xticks(range(shares.shape[1]))
+    ax.set_xticklabels(shares.columns, rotation=90)
+    ticks = np.linspace(0, len(shares) - 1, min(len(shares), 10)).astype(int)
+    ax.set_yticks(ticks)
+    ax.set_yticklabels(shares.index[ticks])
+    ax.set_ylabel("row")
+    if cbar:
+        ax.figure.colorbar(image, ax=ax, label="missing share")
+    return ax
+
+
+def plot_null_patterns(data, top=30, ax=None):
+    """Draws the most frequent null patterns of ``data``, one line per pattern.
+
+    Args:
+        data (DataFrame): Data, a Profile or a boolean null mask.
+        top (int, optional): Number of patterns drawn. Defaults to 30.
+        ax (Axes, optional): Axes to draw on. Defaults to the current axes.
+
+    Returns:
+        Axes: the patterns, labelled with their row counts
+    """
+    _require_matplotlib()
+    patterns, counts = null_patterns(data, top)
+    ax = ax or plt.gca()
+    ax.imshow(patterns.to_numpy(), aspect="auto", interpolation="nearest", cmap="Greys")
+    ax.set_xticks(range(patterns.shape[1]))
+    ax.set_xticklabels(patterns.columns, rotation=90)
+    ax.set_yticks(range(len(counts)))
+    ax.set_yticklabels(["{:,} rows".format(n) for n in counts])
+    return ax
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from .address import parse_address_value
+from .description import parse_description, parse_description_value
+from .parsers import (
+    AVAILABILITY_FIELDS,
+    parse_area,
+    parse_area_value,
+    parse_availability,
+    parse_availability_value,
+    parse_float,
+    parse_floor,
+    parse_floor_value,
+    parse_room_count,
+    parse_room_count_value,
+)
+from .pipeline import Coalesce, Column, Expand, Extract, Replace
+from .postcodes import load_postcodes
+from .schema import OUTPUT_SCHEMA
+from .specs import V2, _canton
+
+
+def _missing(x):
+    return x is None or (pd.api.types.is_scalar(x) and pd.isna(x))
+
+
+def _blank(x):
+    return isinstance(x, str) and not x.strip()
+
+
+def _float(x):
+    if _missing(x):
+        return None
+    return float(x)
+
+
+def _int(x, dtype):
+    # Like schema.apply_schema: out of range or fractional values are missing
+    try:
+        x = float(x)
+    except (TypeError, ValueError):
+        return None
+    info = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+    if not (x.is_integer() and info.min <= x <= info.max):
+        return None
+    return int(x)
+
+
+def _availability(x):
+    return dict(zip(AVAILABILITY_FIELDS, parse_availability_value(x)))
+
+
+# Single value counterpart of every vectorised parser used in the spec
+SCALAR = {
+    parse_float: float,
+    parse_room_count: parse_room_count_value,
+    parse_area: parse_area_value,
+    parse_floor: parse_floor_value,
+    parse_description: parse_description_value,
+    parse_availability: _availability,
+    _canton: lambda zip_code: load_postcodes().canton_of(zip_code),
+}
+
+# Same source priorities as the vectorised helper
+COALESCE = V2.coalesce
+
+
+def _parse(step, value):
+    if step.parse is None or _missing(value):
+        return value
+    return SCALAR[step.parse](value)
+
+
+def _run(step, values):
+    # One pipeline step on a dict of single values, like Step.run on columns
+    if isinstance(step, Column):
+        return {step.outputs[0]: _parse(step, values.get(step.inputs[0]))}
+    if isinstance(step, Coalesce):
+        value = None
+        for source in step.inputs:
+            value = values.get(source)
+            if not _missing(value) and not (step.empty_as_missing and _blank(value)):
+                break
+            value = None
+        return {step.outputs[0]: _parse(step, value)}
+    if isinstance(step, Extract):
+        value = values.get(step.inputs[0])
+        fields = {field: None for field in step.outputs}
+        if not _missing(value):
+            parsed = parse_address_value(value, step.pattern)
+            fields.update({step.prefix + k: v for k, v in parsed.items()})
+        return fields
+    if isinstance(step, Expand):
+        value = values.get(step.inputs[0])
+        fields = {field: None for field in step.outputs}
+        if isinstance(value, str):
+            parsed = SCALAR[step.parse](value)
+            fields.update({step.prefix + k: v for k, v in parsed.items()})
+        return fields
+    if isinstance(step, Replace):
+        value = values.get(step.inputs[0])
+        return {step.outputs[0]: step.mapping.get(value, value)}
+    raise TypeError("Unsupported step " + type(step).__name__)
+
+
+def _cast(value, dtype):
+    if _missing(value):
+        return None
+    if str(dtype) in ("Int16", "UInt16"):
+        return _int(value, dtype)
+    if str(dtype) == "float32":
+        return _float(value)
+    return value
+
+
+def clean_listing(listing, kaggle=False):
+    """Cleans a single raw v2/kaggle listing with the rules of helper_v2.process_data.
+
+    Runs the steps of specs.V2 on plain dicts instead of DataFrames, for online
+    inference, and casts like schema.apply_schema. Only the postcode table is
+    loaded, once per process.
+
+    Args:
+        listing (dict): Raw listing, column name to value. Missing keys count as missing values.
+        kaggle (bool, optional): Leave out the price like process_data(kaggle=True). Defaults to False.
+
+    Returns:
+        dict: cleaned features in the column order of process_data, None for missing values
+    """
+    values = dict(listing)
+    for step in V2.compile().steps:
+        values.update(_run(step, values))
+    return {
+        column: _cast(values[column], OUTPUT_SCHEMA.get(column))
+        for column in V2.outputs
+        if not (kaggle and column == "price")
+    }
+
+
+def clean_listings(listings, kaggle=False):
+    """clean_listing for a batch of listings.
+
+    Args:
+        listings (list): Raw listings as dicts.
+        kaggle (bool, optional): Leave out the price. Defaults to False.
+
+    Returns:
+        list: cleaned listings
+    """
+    return [clean_listing(listing, kaggle=kaggle) for listing in listings]
@@ -0,0 +1,249 @@
+import datetime
+import re
+
+import numpy as np
+import pandas as pd
+
+
+def map_unique(series, func, na_value=np.nan, dtype=float):
+    """Applies ``func`` once per distinct value of ``series`` and maps the results back.
+
+    Args:
+        series (Series): Input values.
+        func (callable): Parser for a single non-null value.
+        na_value (optional): Result for missing values. Defaults to np.nan.
+        dtype (optional): dtype of the result. Defaults to float.
+
+    Returns:
+        Series: parsed values with the index of ``series``
+    """
+    codes, uniques = pd.factorize(series)
+    # code -1 (missing) picks the trailing na_value
+    values = np.array([func(x) for x in uniques] + [na_value], dtype=dtype)
+    return pd.Series(values[codes], index=series.index, name=series.name)
+
+
+def map_unique_records(series, func, columns):
+    """Like map_unique for parsers returning one tuple of fields per value.
+
+    Args:
+        series (Series): Input values.
+        func (callable): Parser returning a tuple with one entry per column.
+        columns (list): Names of the returned fields.
+
+    Returns:
+        DataFrame: parsed fields with the index of ``series``
+    """
+    codes, uniques = pd.factorize(series)
+    records = [func(x) for x in uniques]
+    records.append((None,) * len(columns))
+    # take(-1) (missing) picks the trailing empty record
+    frame = pd.DataFrame.from_records(records, columns=columns).take(codes)
+    frame.index = series.index
+    return frame
+
+
+def map_unique_dicts(series, func, keys=None):
+    """Like map_unique for parsers returning a dict of keys per value, one column per key.
+
+    Args:
+        series (Series): Input values.
+        func (callable): Parser returning a key to value dict, it is not modified.
+        keys (list, optional): Keys to extract. Uses every key found, in order of first appearance, if left default. Defaults to None.
+
+    Returns:
+        DataFrame: one object column per key with the index of ``series``, NaN for missing keys
+    """
+    codes, uniques = pd.factorize(series)
+    parsed = [func(x) for x in uniques]
+    if keys is None:
+        keys = list(dict.fromkeys(key for fields in parsed for key in fields))
+    columns = {}
+    for key in keys:
+        # code -1 (missing) picks the trailing NaN
+        values = [fields.get(key, np.nan) for fields in parsed] + [np.nan]
+        columns[key] = np.array(values, dtype=object)[codes]
+    return pd.DataFrame(columns, index=series.index, columns=keys)
+
+
+## Floor
+_GROUND_FLOOR = re.compile(
+    r"^(?:ground floor|erdgeschoss|eg|parterre|rez-de-chauss[ée]e|rdc|piano terra|pianterreno)$",
+    re.IGNORECASE,
+)
+_UPPER_FLOOR = re.compile(
+    r"(\d+)\s*(?:\.|er|e|ème|°|º)?\s*(?:floor|stock|stockwerk|og|obergeschoss|[ée]tage|piano)\b",
+    re.IGNORECASE,
+)
+_BASEMENT = re.compile(
+    r"basement|untergeschoss|\bug\b|sous-sol|souterrain|seminterrato|interrato",
+    re.IGNORECASE,
+)
+_DIGITS = re.compile(r"\d+")
+
+
+def parse_floor_value(x):
+    """Parses a floor description like "Ground floor", "3. floor" or "2. Basement".
+
+    German, French and Italian variants ("2. Stock", "1er étage", "Sous-sol", ...)
+    are recognised as well. Basements are negative.
+
+    Args:
+        x (str): Floor description.
+
+    Returns:
+        float: floor number, NaN if unknown
+    """
+    if not isinstance(x, str):
+        return np.nan
+    x = x.strip()
+    if _GROUND_FLOOR.match(x):
+        return 0.0
+    match = _UPPER_FLOOR.search(x)
+    if match:
+        return float(match.group(1))
+    if _BASEMENT.search(x):
+        match = _DIGITS.search(x)
+        return -float(match.group()) if match else -1.0
+    return np.nan
+
+
+def parse_floor(series):
+    """Vectorized parse_floor_value over a column of floor descriptions.
+
+    Args:
+        series (Series): Floor descriptions.
+
+    Returns:
+        Series: float floor numbers
+    """
+    return map_unique(series, parse_floor_value)
+
+
+## Area
+_AREA = re.compile(r"(\d+,?\d*)")
+
+
+def parse_area_value(x):
+    """Parses an area like "1,200 m²" into a float, NaN if it has no number."""
+    if not isinstance(x, str):
+        return np.nan
+    match = _AREA.search(x)
+    return float(match.group(1).replace(",", "")) if match else np.nan
+
+
+def parse_area(series):
+    """Vectorized parse_area_value over a column of area descriptions.
+
+    Args:
+        series (Series): Area descriptions.
+
+    Returns:
+        Series: float areas
+    """
+    return map_unique(series, parse_area_value)
+
+
+## Rooms
+def parse_room_count_value(x):
+    """Parses a number of rooms like "3.5rm", "3.5" or 3.5 into a float."""
+    if isinstance(x, str):
+        x = x.replace("rm", "")
+    return float(x)
+
+
+def parse_room_count(series):
+    """Vectorized parse_room_count_value over a column of room counts.
+
+    Args:
+        series (Series): Room counts as labels or numbers.
+
+    Returns:
+        Series: float room counts
+    """
+    return map_unique(series, parse_room_count_value)
+
+
+def parse_float(series):
+    """Casts a numeric column, or one of number strings, to float."""
+    return series.astype(float)
+
+
+## Availability
+# Statuses in the localized spellings of immoscout and homegate, lowercased
+AVAILABILITY_STATUS = {
+    "immediately": "immediately",
+    "sofort": "immediately",
+    "ab sofort": "immediately",
+    "immédiatement": "immediately",
+    "de suite": "immediately",
+    "tout de suite": "immediately",
+    "subito": "immediately",
+    "da subito": "immediately",
+    "immediatamente": "immediately",
+    "on request": "on request",
+    "auf anfrage": "on request",
+    "sur demande": "on request",
+    "su richiesta": "on request",
+    "by agreement": "by agreement",
+    "nach vereinbarung": "by agreement",
+    "à convenir": "by agreement",
+    "par convention": "by agreement",
+    "da convenire": "by agreement",
+    "a convenire": "by agreement",
+}
+AVAILABILITY = ["immediately", "on request", "by agreement", "date"]
+AVAILABILITY_FIELDS = ["availability", "available_from"]
+_DATE = re.compile(r"(\d{1,2}\.\d{1,2}\.\d{4})")
+_DATE_FORMAT = "%d.%m.%Y"
+
+
+def parse_availability_value(x):
+    """Parses an availability like "On request", "Sofort" or "01.10.2022".
+
+    Args:
+        x (str): Availability.
+
+    Returns:
+        tuple: (status out of AVAILABILITY, datetime for dates), None where unknown
+    """
+    if not isinstance(x, str):
+        return None, None
+    match = _DATE.search(x)
+    if match:
+        try:
+            return "date", datetime.datetime.strptime(match.group(1), _DATE_FORMAT)
+        except ValueError:
+            return None, None
+    return AVAILABILITY_STATUS.get(x.strip().lower()), None
+
+
+def parse_availability(series):
+    """Vectorized parse_availability_value over a column of availabilities.
+
+    The distinct values are parsed once: dates are converted with one explicit
+    format instead of format inference, and both fields are mapped back with the
+    codes of the values.
+
+    Args:
+        series (Series): Availabilities.
+
+    Returns:
+        DataFrame: availability as categorical status (AVAILABILITY), available_from as datetime
+    """
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    found = text.str.extract(_DATE, expand=False)
+    dates = pd.to_datetime(found, format=_DATE_FORMAT, errors="coerce")
+    # Text with an invalid date is unknown, like in parse_availability_value
+    status = text.str.strip().str.lower().map(AVAILABILITY_STATUS).where(found.isna())
+    status[dates.notna()] = "date"
+    # code -1 (missing) picks the trailing missing value
+    status = pd.Categorical(
+        np.append(status.to_numpy(dtype=object), None)[codes],
+        categories=AVAILABILITY,
+    )
+    dates = np.append(dates.to_numpy(), np.datetime64("NaT"))[codes]
+    return pd.DataFrame(
+        {"availability": status, "available_from": dates}, index=series.index
+    )
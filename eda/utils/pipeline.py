@@ -0,0 +1,312 @@
+import pandas as pd
+
+from .address import parse_address, pattern_fields
+from .coalesce import coalesce
+from .dedup import deduplicate
+from .spatial import neighbourhood_features
+from .tracing import trace
+
+
+class Column(object):
+    """Takes one column, optionally converted with ``parse``.
+
+    Args:
+        output (str): Name of the result.
+        source (str): Raw or previously computed column.
+        parse (callable, optional): Series to Series conversion. Defaults to None.
+    """
+
+    def __init__(self, output, source, parse=None):
+        self.outputs = [output]
+        self.inputs = [source]
+        self.parse = parse
+        self.name = ("copy " if parse is None else "parse ") + output
+
+    def run(self, columns):
+        series = columns[self.inputs[0]]
+        return {self.outputs[0]: series if self.parse is None else self.parse(series)}
+
+
+class Coalesce(object):
+    """First non-missing value of several columns, see coalesce.coalesce.
+
+    Args:
+        output (str): Name of the result.
+        sources (list): Columns in order of priority.
+        parse (callable, optional): Series to Series conversion of the merged column. Defaults to None.
+        empty_as_missing (bool, optional): Skip empty or whitespace strings like missing values. Defaults to False.
+    """
+
+    def __init__(self, output, sources, parse=None, empty_as_missing=False):
+        self.outputs = [output]
+        self.inputs = list(sources)
+        self.parse = parse
+        self.empty_as_missing = empty_as_missing
+        self.name = "merge " + output
+
+    def run(self, columns):
+        merged, _ = coalesce(
+            columns,
+            self.inputs,
+            name=self.outputs[0],
+            empty_as_missing=self.empty_as_missing,
+        )
+        return {self.outputs[0]: merged if self.parse is None else self.parse(merged)}
+
+
+class Extract(object):
+    """Extracts all named groups of a fused pattern in one pass, see address.parse_address.
+
+    Args:
+        source (str): Column to parse.
+        pattern (Pattern): Compiled pattern with one named group per field.
+        prefix (str, optional): Prefix of the output names. Defaults to "".
+    """
+
+    def __init__(self, source, pattern, prefix=""):
+        self.inputs = [source]
+        self.pattern = pattern
+        self.prefix = prefix
+        self.outputs = [prefix + field for field in pattern_fields(pattern)]
+        self.name = "extract " + source
+
+    def run(self, columns):
+        parsed = parse_address(columns[self.inputs[0]], self.pattern)
+        return {self.prefix + field: parsed[field] for field in parsed.columns}
+
+
+class Expand(object):
+    """Parses one column into several fields in one pass, e.g. description.parse_description.
+
+    Args:
+        source (str): Column to parse.
+        parse (callable): Series to DataFrame conversion with one column per field.
+        fields (list): Names of the parsed fields.
+        prefix (str, optional): Prefix of the output names. Defaults to "".
+        optional (bool, optional): A raw ``source`` missing in the data counts as all missing. Defaults to False.
+    """
+
+    def __init__(self, source, parse, fields, prefix="", optional=False):
+        self.inputs = [source]
+        self.parse = parse
+        self.prefix = prefix
+        self.optional = optional
+        self.outputs = [prefix + field for field in fields]
+        self.name = "expand " + source
+
+    def run(self, columns):
+        source = self.inputs[0]
+        if self.optional and source not in columns:
+            source = pd.Series(None, index=columns.data.index, dtype=object)
+        else:
+            source = columns[source]
+        parsed = self.parse(source)
+        return {self.prefix + field: parsed[field] for field in parsed.columns}
+
+
+class Replace(object):
+    """Replaces known wrong values of a column, e.g. typos in zip codes.
+
+    Args:
+        column (str): Column to fix in place.
+        mapping (dict): Wrong value to correct value.
+    """
+
+    def __init__(self, column, mapping):
+        self.outputs = [column]
+        self.inputs = [column]
+        self.mapping = mapping
+        self.name = "replace " + column
+
+    def run(self, columns):
+        return {self.outputs[0]: columns[self.inputs[0]].replace(self.mapping)}
+
+
+class _Columns(object):
+    # Computed columns first, raw columns of data otherwise
+    def __init__(self, data):
+        self.data = data
+        self.computed = {}
+
+    def __contains__(self, name):
+        return name in self.computed or name in self.data
+
+    def __getitem__(self, name):
+        if name in self.computed:
+            return self.computed[name]
+        return self.data[name]
+
+
+class Plan(object):
+    """Steps of a Pipeline needed for a set of outputs, see Pipeline.compile."""
+
+    def __init__(self, steps, outputs, columns):
+        self.steps = steps
+        self.outputs = outputs
+        self.columns = columns
+
+    def run(self, data, tracer=None):
+        """Runs the steps and returns the outputs as a DataFrame with the index of ``data``.
+
+        Args:
+            data (DataFrame): Raw data.
+            tracer (StageTracer, optional): Records every step as a stage. Defaults to None.
+
+        Returns:
+            DataFrame: outputs
+        """
+        columns = _Columns(data)
+        for step in self.steps:
+            with trace(tracer, step.name, len(data)):
+                columns.computed.update(step.run(columns))
+        with trace(tracer, "assemble", len(data)):
+            return pd.DataFrame(
+                {output: columns[output] for output in self.outputs}, index=data.index
+            )
+
+
+class Pipeline(object):
+    """Declarative cleaning spec of one dataset version.
+
+    Steps read raw columns or the outputs of earlier steps by name. A step may
+    overwrite a name, later steps then see the new column. compile() keeps only the
+    steps needed for the requested outputs, so unused raw columns are neither loaded
+    nor parsed.
+
+    Args:
+        steps (list): Column, Coalesce, Extract, Expand and Replace steps in execution order.
+        outputs (list): Cleaned columns in output order.
+        passthrough (tuple, optional): (first, last) range of raw columns appended unchanged. Defaults to None.
+        gde (tuple, optional): (first, last) range of the raw columns only returned with return_gde. Defaults to None.
+        drop (list, optional): Raw columns of the passthrough range to leave out. Defaults to ().
+        bounds (dict, optional): Inclusive (low, high) bounds per output, values outside become NaN. None leaves a side open. Defaults to None.
+        drop_duplicates (bool, optional): Drop duplicate rows before applying the bounds. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        steps,
+        outputs,
+        passthrough=None,
+        gde=None,
+        drop=(),
+        bounds=None,
+        drop_duplicates=False,
+    ):
+        self.steps = steps
+        self.outputs = outputs
+        self.passthrough = passthrough
+        self.gde = gde
+        self.drop = list(drop)
+        self.bounds = bounds or {}
+        self.drop_duplicates = drop_duplicates
+        self._plans = {}
+
+    @property
+    def columns(self):
+        """list: raw columns read by the steps for all outputs"""
+        return self.compile().columns
+
+    @property
+    def coalesce(self):
+        """dict: ordered source columns per feature of the Coalesce steps"""
+        return {
+            step.outputs[0]: step.inputs
+            for step in self.steps
+            if isinstance(step, Coalesce)
+        }
+
+    def compile(self, outputs=None):
+        """Selects the steps needed for ``outputs``.
+
+        Args:
+            outputs (list, optional): Subset of the outputs. Uses all outputs if left default. Defaults to None.
+
+        Returns:
+            Plan: steps to run and raw columns to read
+        """
+        outputs = tuple(self.outputs if outputs is None else outputs)
+        if outputs not in self._plans:
+            needed = set(outputs)
+            steps = []
+            for step in reversed(self.steps):
+                if needed.intersection(step.outputs):
+                    steps.append(step)
+                    needed.difference_update(step.outputs)
+                    needed.update(step.inputs)
+            steps.reverse()
+            # Raw columns in order of first use
+            produced, columns = set(), []
+            for step in steps:
+                for name in step.inputs:
+                    if name not in produced and name not in columns:
+                        columns.append(name)
+                produced.update(step.outputs)
+            columns += [name for name in outputs if name not in produced]
+            self._plans[outputs] = Plan(steps, list(outputs), columns)
+        return self._plans[outputs]
+
+    def run(
+        self,
+        data,
+        exclude=(),
+        return_gde=False,
+        dedup=None,
+        neighbourhood_km=None,
+        tracer=None,
+    ):
+        """Cleans ``data`` according to the spec.
+
+        Args:
+            data (DataFrame): Raw data.
+            exclude (list, optional): Outputs to leave out. Defaults to ().
+            return_gde (bool, optional): Keep the gde range of the passthrough columns. Defaults to False.
+            dedup (str, optional): "mark" or "collapse" listings of the same property, see dedup.deduplicate. Defaults to None.
+            neighbourhood_km (float, optional): Add the aggregates of the listings within this radius, see spatial.neighbourhood_features. Defaults to None.
+            tracer (StageTracer, optional): Records the steps, join, duplicate removal, bounds, dedup, neighbourhood and gde selection as stages. Defaults to None.
+
+        Returns:
+            DataFrame: cleaned data, without apply_schema
+        """
+        plan = self.compile([o for o in self.outputs if o not in exclude])
+        cleaned = plan.run(data, tracer)
+
+        gde = []
+        if self.gde is not None:
+            gde = list(data.loc[:, self.gde[0] : self.gde[1]].columns)
+        if self.passthrough is not None:
+            extra = data.loc[:, self.passthrough[0] : self.passthrough[1]].columns
+            # Duplicates are judged on the gde columns (and coordinates) as well
+            dropped = set(self.drop)
+            if not (return_gde or self.drop_duplicates or dedup or neighbourhood_km):
+                dropped.update(gde)
+            with trace(tracer, "join", len(cleaned)):
+                cleaned = cleaned.join(data[[c for c in extra if c not in dropped]])
+
+        if self.drop_duplicates:
+            with trace(tracer, "drop duplicates", len(cleaned)):
+                cleaned = cleaned.drop_duplicates()
+        if self.bounds:
+            with trace(tracer, "bounds", len(cleaned)):
+                for column, (low, high) in self.bounds.items():
+                    if column in cleaned:
+                        values = cleaned[column]
+                        outside = pd.Series(False, index=cleaned.index)
+                        if low is not None:
+                            outside |= values < low
+                        if high is not None:
+                            outside |= values > high
+                        cleaned[column] = values.mask(outside)
+        if dedup:
+            with trace(tracer, "dedup", len(cleaned)):
+                cleaned = deduplicate(cleaned, how=dedup)
+        if neighbourhood_km:
+            with trace(tracer, "neighbourhood", len(cleaned)):
+                cleaned = cleaned.join(
+                    neighbourhood_features(cleaned, neighbourhood_km)
+                )
+
+        if not return_gde and any(c in cleaned for c in gde):
+            with trace(tracer, "gde selection", len(cleaned)):
+                cleaned = cleaned.drop([c for c in gde if c in cleaned], axis=1)
+        return cleaned
@@ -0,0 +1,128 @@
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from .cache import cached_path, file_sha256, get_cache
+
+PLZ_URL = "https://github.com/Immobilienrechner-Challenge/data/raw/main/plz.xlsx"
+
+
+class PostcodeTable(object):
+    """Swiss postcodes with their municipality and canton, sorted by postcode.
+
+    Lookups are binary searches over the sorted postcode array and accept whole
+    columns at once.
+
+    Args:
+        plz (ndarray): Unique postcodes.
+        municipality (ndarray): Municipality per postcode.
+        canton (ndarray): Canton abbreviation per postcode.
+    """
+
+    def __init__(self, plz, municipality, canton):
+        order = np.argsort(plz, kind="stable")
+        self.plz = np.asarray(plz, dtype=np.int32)[order]
+        self.municipalities = np.asarray(municipality, dtype=str)[order]
+        self.cantons = np.asarray(canton, dtype=str)[order]
+        # Position per postcode for single lookups without numpy overhead
+        self._positions_by_plz = {plz: i for i, plz in enumerate(self.plz.tolist())}
+
+    @classmethod
+    def from_excel(cls, path):
+        """Reads the plz.xlsx sheet, keeping the first entry per postcode."""
+        df_xlsx_plz = pd.read_excel(path, sheet_name="Blatt1")
+        df_xlsx_plz.drop(
+            ["Kanton", "Canton", "Cantone", "Land", "Pays", "Paese"],
+            axis=1,
+            inplace=True,
+        )
+        df_xlsx_plz = df_xlsx_plz.iloc[:, :3]
+        df_xlsx_plz.columns = ["plz", "municipality", "canton"]
+        df_xlsx_plz = df_xlsx_plz.drop_duplicates(subset=["plz"])
+        return cls(
+            df_xlsx_plz["plz"].to_numpy(),
+            df_xlsx_plz["municipality"].to_numpy(),
+            df_xlsx_plz["canton"].to_numpy(),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as npz:
+            return cls(npz["plz"], npz["municipality"], npz["canton"])
+
+    def save(self, path):
+        np.savez(
+            path, plz=self.plz, municipality=self.municipalities, canton=self.cantons
+        )
+
+    def _positions(self, zip_codes):
+        codes = pd.to_numeric(pd.Series(zip_codes), errors="coerce")
+        codes = codes.fillna(-1).to_numpy(dtype=np.int64)
+        positions = np.searchsorted(self.plz, codes).clip(max=len(self.plz) - 1)
+        return positions, self.plz[positions] == codes
+
+    def _lookup(self, values, zip_codes):
+        positions, found = self._positions(zip_codes)
+        index = zip_codes.index if isinstance(zip_codes, pd.Series) else None
+        return pd.Series(values[positions], index=index, dtype=object).where(found)
+
+    def canton(self, zip_codes):
+        """Maps postcodes to canton abbreviations, NaN for unknown postcodes.
+
+        Args:
+            zip_codes (Series): Postcodes as numbers or strings.
+
+        Returns:
+            Series: cantons with the index of ``zip_codes``
+        """
+        return self._lookup(self.cantons, zip_codes)
+
+    def municipality(self, zip_codes):
+        """Maps postcodes to municipalities, NaN for unknown postcodes.
+
+        Args:
+            zip_codes (Series): Postcodes as numbers or strings.
+
+        Returns:
+            Series: municipalities with the index of ``zip_codes``
+        """
+        return self._lookup(self.municipalities, zip_codes)
+
+    def canton_of(self, zip_code):
+        """Returns the canton of a single postcode, None if unknown."""
+        position = self._positions_by_plz.get(zip_code)
+        return None if position is None else str(self.cantons[position])
+
+    def municipality_of(self, zip_code):
+        """Returns the municipality of a single postcode, None if unknown."""
+        position = self._positions_by_plz.get(zip_code)
+        return None if position is None else str(self.municipalities[position])
+
+
+def load_postcodes(url=None):
+    """Returns the PostcodeTable for ``url``, memoized per process.
+
+    The sheet is converted to a compact .npz file next to the cache on first use, so
+    later processes skip the Excel parsing.
+
+    Args:
+        url (str, optional): Location of plz.xlsx. Defaults to $IMMO_PLZ_URL or PLZ_URL.
+
+    Returns:
+        PostcodeTable: postcode lookup table
+    """
+    return _load_postcodes(url or os.environ.get("IMMO_PLZ_URL", PLZ_URL))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_postcodes(url):
+    path = cached_path(url)
+    converted = os.path.join(get_cache().root, "postcodes", file_sha256(path) + ".npz")
+    if os.path.exists(converted):
+        return PostcodeTable.load(converted)
+    table = PostcodeTable.from_excel(path)
+    os.makedirs(os.path.dirname(converted), exist_ok=True)
+    table.save(converted)
+    return table
@@ -0,0 +1,220 @@
+import base64
+import json
+import os
+import tempfile
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .cache import get_cache
+
+TOP_VALUES = 10
+
+
+def _encode_mask(bits):
+    return base64.b64encode(zlib.compress(bits.tobytes())).decode("ascii")
+
+
+def _decode_mask(text, rows):
+    bits = np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype=np.uint8)
+    return np.unpackbits(bits, count=rows).astype(bool)
+
+
+def _value_counts(series):
+    try:
+        return series.value_counts(dropna=True)
+    except TypeError:
+        # Unhashable cells such as lists or dicts
+        return series.dropna().astype(str).value_counts()
+
+
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def profile_frame(data, top=TOP_VALUES):
+    """Computes the column statistics of ``data`` in one pass per column.
+
+    Args:
+        data (DataFrame): Raw or cleaned data.
+        top (int, optional): Most frequent values kept per column. Defaults to TOP_VALUES.
+
+    Returns:
+        Profile: statistics and null masks of every column
+    """
+    mask = data.isna().to_numpy()
+    # One bitmap per column, 8 rows per byte
+    bitmaps = np.packbits(mask, axis=0).T
+    columns = {}
+    for i, column in enumerate(data.columns):
+        counts = _value_counts(data.iloc[:, i])
+        columns[str(column)] = {
+            "dtype": str(data.dtypes.iloc[i]),
+            "count": int(len(data) - mask[:, i].sum()),
+            "distinct": int(len(counts)),
+            "top": [[_json_value(v), int(n)] for v, n in counts.head(top).items()],
+            "nulls": _encode_mask(bitmaps[i]),
+        }
+    return Profile({"rows": len(data), "columns": columns})
+
+
+class Profile(object):
+    """Per-column statistics of one dataset, answering queries without the data.
+
+    Holds for every column its dtype, non-null and distinct counts, the most
+    frequent values and the null mask as a compressed bitmap, so coverage and the
+    overlap of columns can be computed without loading the dataset again.
+
+    Args:
+        state (dict): Output of profile_frame, or a profile loaded from a ProfileStore.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.rows = state["rows"]
+        self._masks = {}
+
+    @property
+    def columns(self):
+        """list: names of the profiled columns"""
+        return list(self.state["columns"])
+
+    def summary(self):
+        """Returns one row per column with dtype, count, distinct and coverage."""
+        frame = pd.DataFrame.from_dict(self.state["columns"], orient="index")
+        frame = frame.loc[:, ["dtype", "count", "distinct"]]
+        frame["coverage"] = frame["count"] / self.rows if self.rows else np.nan
+        return frame
+
+    def coverage(self, columns=None):
+        """Returns the share of non-null rows per column, like data.count() / len(data)."""
+        counts = self.summary()["coverage"]
+        return counts if columns is None else counts.loc[list(columns)]
+
+    def top(self, column):
+        """Returns the most frequent values of ``column`` and their counts."""
+        values = self.state["columns"][column]["top"]
+        return pd.Series(
+            [n for _, n in values],
+            index=[v for v, _ in values],
+            name=column,
+            dtype="int64",
+        )
+
+    def null_mask(self, column):
+        """Returns the boolean null mask of ``column``, like data[column].isna()."""
+        if column not in self._masks:
+            text = self.state["columns"][column]["nulls"]
+            self._masks[column] = _decode_mask(text, self.rows)
+        return self._masks[column]
+
+    def null_masks(self, columns=None):
+        """Returns the null masks of ``columns`` as a DataFrame, like data.isna()."""
+        columns = self.columns if columns is None else list(columns)
+        return pd.DataFrame({c: self.null_mask(c) for c in columns})
+
+    def overlap(self, columns=None, normalize=False):
+        """Counts the rows in which two columns are both set.
+
+        Useful to decide whether sources of one feature complement each other or
+        hold the same rows.
+
+        Args:
+            columns (list, optional): Columns to compare. Defaults to all columns.
+            normalize (bool, optional): Divide by the number of rows. Defaults to False.
+
+        Returns:
+            DataFrame: symmetric matrix, the diagonal holds the non-null counts
+        """
+        columns = self.columns if columns is None else list(columns)
+        present = ~self.null_masks(columns).to_numpy()
+        # float64 uses BLAS and counts exactly up to 2**53 rows, float32 only 2**24
+        present = present.astype(np.float64)
+        counts = (present.T @ present).astype(np.int64)
+        frame = pd.DataFrame(counts, index=columns, columns=columns)
+        if normalize:
+            frame = frame / self.rows
+        return frame
+
+
+def schema_diff(left, right):
+    """Compares the columns and dtypes of two profiles.
+
+    Args:
+        left (Profile): First dataset, e.g. v2.
+        right (Profile): Second dataset, e.g. kaggle.
+
+    Returns:
+        DataFrame: one row per column that is missing on one side or changed its dtype
+    """
+    a = left.summary()["dtype"].rename("left")
+    b = right.summary()["dtype"].rename("right")
+    frame = pd.concat([a, b], axis=1, sort=False)
+    frame["status"] = np.select(
+        [frame["right"].isna(), frame["left"].isna()],
+        ["left_only", "right_only"],
+        "dtype_changed",
+    )
+    return frame.loc[frame["left"].ne(frame["right"])]
+
+
+class ProfileStore(object):
+    """Directory of persisted profiles, one JSON file per dataset name.
+
+    A profile is computed once per dataset and reused until its ``token`` changes,
+    so exploring a dataset version does not rescan all columns on every rerun.
+
+        store = ProfileStore()
+        v2 = store.get("v2", helper.dataset.load)
+        v2.coverage()
+
+    Args:
+        root (str, optional): Directory of the profiles. Defaults to <cache>/profiles.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(get_cache().root, "profiles")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.root, name + ".json")
+
+    def load(self, name, token=None):
+        """Returns the stored profile ``name``, None if missing or stored for another token."""
+        try:
+            with open(self._path(name)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Compare as stored, tuples come back from JSON as lists
+        if state.get("token") != json.loads(json.dumps(token, default=str)):
+            return None
+        return Profile(state)
+
+    def save(self, name, profile, token=None):
+        """Stores ``profile`` under ``name``."""
+        state = dict(profile.state, token=token)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, default=str)
+        os.replace(tmp, self._path(name))
+
+    def get(self, name, load, token=None, refresh=False, top=TOP_VALUES):
+        """Returns the profile ``name``, computing and storing it on a cache miss.
+
+        Args:
+            name (str): Dataset name, e.g. "v2" or "kaggle".
+            load (callable): Returns the DataFrame to profile, only called on a miss.
+            token (optional): JSON value identifying the dataset content, e.g. its URL or sha256. Defaults to None.
+            refresh (bool, optional): Profile again even if stored. Defaults to False.
+            top (int, optional): Most frequent values kept per column. Defaults to TOP_VALUES.
+
+        Returns:
+            Profile: profile of the dataset
+        """
+        profile = None if refresh else self.load(name, token)
+        if profile is None:
+            profile = profile_frame(load(), top=top)
+            self.save(name, profile, token)
+        return profile
@@ -0,0 +1,160 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import sweetviz as sv
+except ImportError:
+    sv = None
+
+# Column groups of the sweetviz reports: a list of columns, a (first, last) range or
+# None for all columns
+REPORT_GROUPS = {
+    "sweetviz_report": None,
+    "sweetviz_SML": [
+        "ForestDensityL",
+        "ForestDensityM",
+        "ForestDensityS",
+        "NoisePollutionRailwayL",
+        "NoisePollutionRailwayM",
+        "NoisePollutionRailwayS",
+        "NoisePollutionRoadL",
+        "NoisePollutionRoadM",
+        "NoisePollutionRoadS",
+        "PopulationDensityL",
+        "PopulationDensityM",
+        "PopulationDensityS",
+        "RiversAndLakesL",
+        "RiversAndLakesM",
+        "RiversAndLakesS",
+        "WorkplaceDensityL",
+        "WorkplaceDensityM",
+        "WorkplaceDensityS",
+        "distanceToTrainStation",
+        "zip_code",
+    ],
+    "sweetviz_gde": ("gde_area_agriculture_percentage", "gde_workers_total"),
+    "sweetviz_locality": [
+        "municipality",
+        "street",
+        "street_nr",
+        "zip_code",
+        "canton",
+        "Latitude",
+        "Longitude",
+    ],
+    "sweetviz_immo": [
+        "living_space",
+        "rooms",
+        "plot_area",
+        "floor_space",
+        "floor",
+        "type",
+    ],
+}
+STRATA = ["canton", "type"]
+
+
+def stratified_sample(df, max_rows, by=STRATA, seed=0):
+    """Samples at most about ``max_rows`` rows, keeping the share of every stratum.
+
+    Every stratum keeps at least one row, so the result can exceed ``max_rows`` by
+    the number of small strata. Strata columns missing from ``df`` are ignored, without
+    any a plain random sample is taken. Rows keep their original order.
+
+    Args:
+        df (DataFrame): Data to sample.
+        max_rows (int): Row budget.
+        by (list, optional): Strata columns. Defaults to STRATA (canton and type).
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        DataFrame: sample of ``df``, ``df`` itself if it fits the budget
+    """
+    if len(df) <= max_rows:
+        return df
+    rng = np.random.default_rng(seed)
+    by = [c for c in by if c in df.columns]
+    if by:
+        codes = df.groupby(by, dropna=False, observed=True, sort=False).ngroup()
+        codes = codes.to_numpy()
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+    counts = np.bincount(codes)
+    quota = np.maximum(1, np.floor(counts * max_rows / len(df))).astype(np.int64)
+
+    # Random order within each stratum, then keep the first quota rows per stratum
+    order = rng.permutation(len(df))
+    order = order[np.argsort(codes[order], kind="stable")]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(df)) - starts[codes[order]]
+    keep = order[rank < quota[codes[order]]]
+    return df.iloc[np.sort(keep)]
+
+
+def _select(df, columns):
+    if columns is None:
+        return df
+    if isinstance(columns, tuple):
+        return df.loc[:, columns[0] : columns[1]]
+    return df.loc[:, columns]
+
+
+def _render(task):
+    frame, path = task
+    sv.analyze(frame).show_html(path, open_browser=False)
+    return path
+
+
+def generate_reports(
+    df,
+    output_dir,
+    groups=REPORT_GROUPS,
+    uncleaned=None,
+    max_rows=None,
+    by=STRATA,
+    n_jobs=None,
+):
+    """Renders one sweetviz report per column group, in parallel worker processes.
+
+    Requires the optional dependency sweetviz.
+
+    Args:
+        df (DataFrame): Cleaned data, e.g. the result of process_data or build.
+        output_dir (str): Directory of the html reports, named after the groups.
+        groups (dict, optional): Columns per report name. Defaults to REPORT_GROUPS.
+        uncleaned (DataFrame, optional): Raw data, rendered as "<first group>_uncleaned" if given. Defaults to None.
+        max_rows (int, optional): Row budget of the reports, see stratified_sample. Defaults to None (all rows).
+        by (list, optional): Strata columns for the sampling. Defaults to STRATA.
+        n_jobs (int, optional): Worker processes, 1 renders in this process. Defaults to os.cpu_count().
+
+    Returns:
+        list: paths of the written reports
+    """
+    if sv is None:
+        raise ImportError("generate_reports requires sweetviz")
+    if max_rows is not None:
+        df = stratified_sample(df, max_rows, by)
+        if uncleaned is not None:
+            uncleaned = stratified_sample(uncleaned, max_rows, by)
+
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [
+        (_select(df, columns), os.path.join(output_dir, name + ".html"))
+        for name, columns in groups.items()
+    ]
+    if uncleaned is not None:
+        name = next(iter(groups), "sweetviz_report") + "_uncleaned"
+        tasks.insert(1, (uncleaned, os.path.join(output_dir, name + ".html")))
+
+    paths = [path for _, path in tasks]
+    if n_jobs == 1:
+        for task in tasks:
+            _render(task)
+        return paths
+    # Largest reports first, so they do not end up last on a single worker
+    tasks.sort(key=lambda task: task[0].size, reverse=True)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        list(executor.map(_render, tasks))
+    return paths
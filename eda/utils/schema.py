@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    STRING = pd.StringDtype("pyarrow")
+except ImportError:
+    STRING = pd.StringDtype()
+
+# dtypes of the cleaned columns, shared by all helper versions
+OUTPUT_SCHEMA = {
+    "living_space": "float32",
+    # float32 holds half rooms exactly
+    "rooms": "float32",
+    "plot_area": "float32",
+    "floor_space": "float32",
+    "floor": "Int16",
+    "availability": "category",
+    "available_from": "datetime64[ns]",
+    "price": "float64",
+    "zip_code": "UInt16",
+    "municipality": "category",
+    "canton": "category",
+    "street": STRING,
+    "street_nr": STRING,
+    "type": "category",
+    "features": STRING,
+    "last_refurbishment": "UInt16",
+    "year_built": "UInt16",
+}
+# Other float64 columns (the gde block) are stored as float32, except these
+FLOAT64_COLUMNS = {"price", "Latitude", "Longitude"}
+
+
+def _to_int(series, dtype):
+    numeric = pd.to_numeric(series, errors="coerce")
+    info = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+    valid = numeric.between(info.min, info.max) & (numeric % 1 == 0)
+    return numeric.where(valid).astype(dtype)
+
+
+def apply_schema(df):
+    """Casts a cleaned DataFrame to OUTPUT_SCHEMA.
+
+    Values that do not fit an integer column (out of range or fractional) become
+    missing. Columns not in the schema keep their dtype, apart from float64 columns
+    which are downcast to float32.
+
+    Args:
+        df (DataFrame): cleaned data
+
+    Returns:
+        DataFrame: cleaned data with compact dtypes
+    """
+    casts = {}
+    for column in df.columns:
+        dtype = OUTPUT_SCHEMA.get(column)
+        if dtype is None:
+            if df[column].dtype == "float64" and column not in FLOAT64_COLUMNS:
+                casts[column] = df[column].astype("float32")
+        elif str(dtype) in ("Int16", "UInt16"):
+            casts[column] = _to_int(df[column], dtype)
+        elif str(dtype) == "float32":
+            casts[column] = pd.to_numeric(df[column], errors="coerce").astype(dtype)
+        else:
+            casts[column] = df[column].astype(dtype)
+    return df.assign(**casts)
@@ -0,0 +1,297 @@
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+# Key of a grid cell: column * _ROW_STRIDE + row
+_ROW_STRIDE = 2**31
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Returns the great circle distances in km between arrays of coordinates in degrees."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+class GridIndex(object):
+    """Uniform grid over Latitude/Longitude answering radius and k-nearest queries.
+
+    Points are projected to km and sorted by grid cell, a query only looks at the
+    cells within its radius and measures haversine distances to the points in them.
+    Longitudes are scaled for the latitude of the indexed point farthest from the
+    equator, so no cell within the radius is skipped for queries in the latitude
+    range of the points.
+
+        index = GridIndex(df["Latitude"], df["Longitude"])
+        distances, neighbours = index.query(lat, lon, k=5)
+
+    Args:
+        lat (array): Latitudes in degrees, missing points are not indexed.
+        lon (array): Longitudes in degrees.
+        cell_km (float, optional): Edge length of a cell, about the typical query radius. Defaults to 1.0.
+    """
+
+    def __init__(self, lat, lon, cell_km=1.0):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        self.cell_km = cell_km
+        valid = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        reference = np.abs(lat[valid]).max() if len(valid) else 0.0
+        self._scale = np.cos(np.radians(reference))
+        keys = self._keys(*self._cells(lat[valid], lon[valid]))
+        order = np.argsort(keys, kind="stable")
+        # Occupied cells with the range of their points
+        self._cells_keys, self._cells_start, self._cells_count = np.unique(
+            keys[order], return_index=True, return_counts=True
+        )
+        # Points in cell order and their positions in the original arrays
+        self.positions = valid[order]
+        self.lat, self.lon = lat[self.positions], lon[self.positions]
+        self._xyz = _unit_vectors(self.lat, self.lon)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _cells(self, lat, lon):
+        km = np.radians(1) * EARTH_RADIUS_KM
+        column = np.floor(lon * km * self._scale / self.cell_km).astype(np.int64)
+        row = np.floor(lat * km / self.cell_km).astype(np.int64)
+        return column, row
+
+    @staticmethod
+    def _keys(column, row):
+        return column * _ROW_STRIDE + row
+
+    def iter_radius_pairs(self, lat, lon, radius_km, batch=65536):
+        """Yields radius_pairs for batches of ``batch`` queries, bounding the memory.
+
+        Args:
+            lat (array): Query latitudes in degrees, missing queries have no pairs.
+            lon (array): Query longitudes in degrees.
+            radius_km (float): Search radius.
+            batch (int, optional): Queries per batch. Defaults to 65536.
+
+        Yields:
+            tuple: (query positions, point positions in the original arrays, distances in km), sorted by query
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        for start in range(0, len(lat), batch):
+            q, p, d = self._radius_pairs(
+                lat[start : start + batch], lon[start : start + batch], radius_km
+            )
+            yield q + start, p, d
+
+    def radius_pairs(self, lat, lon, radius_km, batch=65536):
+        """Finds all indexed points within ``radius_km`` of every query point.
+
+        Args:
+            lat (array): Query latitudes in degrees, missing queries have no pairs.
+            lon (array): Query longitudes in degrees.
+            radius_km (float): Search radius.
+            batch (int, optional): Queries per batch. Defaults to 65536.
+
+        Returns:
+            tuple: (query positions, point positions in the original arrays, distances in km), sorted by query
+        """
+        parts = list(self.iter_radius_pairs(lat, lon, radius_km, batch))
+        if not parts:
+            return self._radius_pairs(lat, lon, radius_km)
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    def _radius_pairs(self, lat, lon, radius_km):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        queries = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        if not len(self):
+            queries = queries[:0]
+        column, row = self._cells(lat[queries], lon[queries])
+        # Queries in cell order make the cell lookups cache friendly
+        by_cell = np.argsort(self._keys(column, row), kind="stable")
+        queries, column, row = queries[by_cell], column[by_cell], row[by_cell]
+        reach = int(np.ceil(radius_km / self.cell_km))
+        # Compare squared chords of the unit sphere, monotone in the distance
+        xyz = _unit_vectors(lat[queries], lon[queries])
+        limit = (2 * np.sin(radius_km / EARTH_RADIUS_KM / 2)) ** 2
+
+        found_queries, found_points, found_chords = [], [], []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                keys = self._keys(column + dx, row + dy)
+                cell = np.searchsorted(self._cells_keys, keys)
+                cell = np.minimum(cell, len(self._cells_keys) - 1)
+                start = self._cells_start[cell]
+                counts = np.where(
+                    self._cells_keys[cell] == keys, self._cells_count[cell], 0
+                )
+                total = counts.sum()
+                if not total:
+                    continue
+                # Expand every query to the points of its cell
+                offsets = np.arange(total) - np.repeat(
+                    np.cumsum(counts) - counts, counts
+                )
+                q = np.repeat(np.arange(len(queries)), counts)
+                p = np.repeat(start, counts) + offsets
+                chord = sum((a[q] - b[p]) ** 2 for a, b in zip(xyz, self._xyz))
+                inside = chord <= limit
+                found_queries.append(q[inside])
+                found_points.append(p[inside])
+                found_chords.append(chord[inside])
+        if not found_queries:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, np.array([], dtype=float)
+
+        q = queries[np.concatenate(found_queries)]
+        order = np.argsort(q, kind="stable")
+        p = np.concatenate(found_points)[order]
+        chord = np.concatenate(found_chords)[order]
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(chord) / 2)
+        return q[order], self.positions[p], distance
+
+    def query(self, lat, lon, k=1, max_reach=8, batch=65536):
+        """Finds the ``k`` nearest indexed points of every query point.
+
+        The search radius is doubled for the queries that have fewer than ``k``
+        points within it. Queries still missing neighbours beyond ``max_reach``
+        cells, such as outliers far from all points, are compared to all points.
+        The result is exact.
+
+        Args:
+            lat (array): Query latitudes in degrees.
+            lon (array): Query longitudes in degrees.
+            k (int, optional): Number of neighbours. Defaults to 1.
+            max_reach (int, optional): Largest search radius in cells. Defaults to 8.
+            batch (int, optional): Queries per batch. Defaults to 65536.
+
+        Returns:
+            tuple: (distances in km, positions of the points in the original arrays), both of shape (queries, k), padded with inf and -1
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        distances = np.full((len(lat), k), np.inf)
+        neighbours = np.full((len(lat), k), -1, dtype=np.int64)
+        if not len(self):
+            return distances, neighbours
+        for start in range(0, len(lat), batch):
+            end = start + batch
+            self._query(
+                lat[start:end],
+                lon[start:end],
+                k,
+                max_reach,
+                distances[start:end],
+                neighbours[start:end],
+            )
+        return distances, neighbours
+
+    def _query(self, lat, lon, k, max_reach, distances, neighbours):
+        # Fills the views distances and neighbours for one batch of queries
+        pending = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        # Start with the radius holding k points at the density of the occupied cells
+        area = len(self._cells_keys) * self.cell_km**2
+        radius = min(np.sqrt(k * area / len(self) / np.pi), max_reach * self.cell_km)
+        while len(pending) and radius <= max_reach * self.cell_km:
+            q, p, d = self._radius_pairs(lat[pending], lon[pending], radius)
+            done = np.bincount(q, minlength=len(pending)) >= k
+            keep = done[q]
+            self._fill(distances, neighbours, pending, q[keep], p[keep], d[keep], k)
+            pending = pending[~done]
+            radius *= 2
+
+        # Remaining queries against all points, in batches of bounded size
+        step = max(1, 2**22 // len(self))
+        for start in range(0, len(pending), step):
+            rows = pending[start : start + step]
+            q = np.repeat(np.arange(len(rows)), len(self))
+            p = np.tile(np.arange(len(self)), len(rows))
+            d = haversine(lat[rows][q], lon[rows][q], self.lat[p], self.lon[p])
+            self._fill(distances, neighbours, rows, q, self.positions[p], d, k)
+
+    @staticmethod
+    def _fill(distances, neighbours, rows, q, p, d, k):
+        # Closest first within every query, then the first k per query
+        order = np.lexsort((d, q))
+        q, p, d = q[order], p[order], d[order]
+        counts = np.bincount(q, minlength=len(rows))
+        rank = np.arange(len(q)) - np.repeat(np.cumsum(counts) - counts, counts)
+        first = rank < k
+        distances[rows[q[first]], rank[first]] = d[first]
+        neighbours[rows[q[first]], rank[first]] = p[first]
+
+
+def neighbourhood_features(data, radius_km=1.0, reference=None, batch=65536):
+    """Aggregates the listings within ``radius_km`` of every row.
+
+    Columns:
+        neighbours: listings within the radius, without the row itself
+        neighbour_density: neighbours per km²
+        neighbour_price_m2: median price per m² living space of the neighbours
+
+    Args:
+        data (DataFrame): Cleaned data with Latitude and Longitude.
+        radius_km (float, optional): Radius of the neighbourhood. Defaults to 1.0.
+        reference (DataFrame, optional): Listings to aggregate, e.g. the training data for the kaggle validation set. Defaults to ``data`` without the row itself.
+        batch (int, optional): Rows per batch, bounds the memory. Defaults to 65536.
+
+    Returns:
+        DataFrame: features with the index of ``data``, missing without coordinates
+    """
+    exclude_self = reference is None
+    if reference is None:
+        reference = data
+    if "price" in reference and "living_space" in reference:
+        price_m2 = pd.to_numeric(reference["price"], errors="coerce") / pd.to_numeric(
+            reference["living_space"], errors="coerce"
+        )
+        price_m2 = price_m2.to_numpy(dtype=float, na_value=np.nan, copy=True)
+    else:
+        price_m2 = np.full(len(reference), np.nan)
+    price_m2[~np.isfinite(price_m2)] = np.nan
+    # Sorting (row, rank of the value) pairs sorts the values within every row
+    ranked = np.argsort(price_m2)
+    rank = np.empty(len(price_m2), dtype=np.int64)
+    rank[ranked] = np.arange(len(price_m2))
+    known = ~np.isnan(price_m2)
+
+    def coordinates(frame):
+        return [
+            pd.to_numeric(frame[c], errors="coerce").to_numpy(
+                dtype=float, na_value=np.nan
+            )
+            for c in ("Latitude", "Longitude")
+        ]
+
+    lat, lon = coordinates(data)
+    index = GridIndex(*coordinates(reference), cell_km=radius_km)
+    counts = np.zeros(len(data))
+    medians = np.full(len(data), np.nan)
+    for q, p, _ in index.iter_radius_pairs(lat, lon, radius_km, batch):
+        if exclude_self:
+            q, p = q[q != p], p[q != p]
+        counts += np.bincount(q, minlength=len(data))
+        # Median of the sorted values per row
+        q, p = q[known[p]], p[known[p]]
+        keys = np.sort(q * len(price_m2) + rank[p])
+        q, values = keys // len(price_m2), price_m2[ranked[keys % len(price_m2)]]
+        rows, start, n = np.unique(q, return_index=True, return_counts=True)
+        medians[rows] = (values[start + (n - 1) // 2] + values[start + n // 2]) / 2
+
+    missing = np.isnan(lat) | np.isnan(lon)
+    counts[missing] = np.nan
+    return pd.DataFrame(
+        {
+            "neighbours": counts,
+            "neighbour_density": counts / (np.pi * radius_km**2),
+            "neighbour_price_m2": medians,
+        },
+        index=data.index,
+    )
@@ -0,0 +1,251 @@
+from .address import ADDRESS, ADDRESS_S, ADDRESS_V1, LOCATION, ZIP_TYPOS
+from .description import FIELDS, parse_description
+from .details import parse_rooms
+from .parsers import (
+    AVAILABILITY_FIELDS,
+    parse_area,
+    parse_availability,
+    parse_float,
+    parse_floor,
+    parse_room_count,
+)
+from .pipeline import Coalesce, Column, Expand, Extract, Pipeline, Replace
+from .postcodes import load_postcodes
+from .table import parse_table
+
+# Cleaning specs of the dataset versions, run by the ImmoHelper of each version
+
+GDE = ("ForestDensityL", "gde_workers_total")
+# Rooms, living space, price and type of the description, the last resort of the
+# merges. Not every export has the column
+DESCRIPTION = Expand(
+    "description", parse_description, FIELDS, prefix="description_", optional=True
+)
+
+
+def _canton(zip_codes):
+    return load_postcodes().canton(zip_codes)
+
+
+# Rows of the html table of v1 used as the last structured source
+TABLE_KEYS = ["Living space", "Plot area", "Floor space", "Floor", "Availability"]
+
+
+def _table(tables):
+    return parse_table(tables, TABLE_KEYS)
+
+
+## immoscout_cleaned_lat_lon_fixed_v9.csv, helper_v1
+V1 = Pipeline(
+    steps=[
+        DESCRIPTION,
+        Expand("table", _table, TABLE_KEYS, prefix="table.", optional=True),
+        Column("table_living_space", "table.Living space", parse=parse_area),
+        Coalesce(
+            "living_space",
+            ["Space extracted", "table_living_space", "description_living_space"],
+            parse=parse_float,
+        ),
+        Column("details_rooms", "details_structured", parse=parse_rooms),
+        Coalesce("rooms", ["details_rooms", "description_rooms"]),
+        Coalesce(
+            "plot_area",
+            [
+                "Plot_area_merged",
+                "detail_responsive#surface_property",
+                "table.Plot area",
+            ],
+            parse=parse_area,
+        ),
+        Coalesce(
+            "floor_space",
+            [
+                "Floor_space_merged",
+                "detail_responsive#surface_usable",
+                "table.Floor space",
+            ],
+            parse=parse_area,
+        ),
+        Coalesce(
+            "floor",
+            ["Floor_merged", "detail_responsive#floor", "table.Floor"],
+            parse=parse_floor,
+        ),
+        Coalesce(
+            "availability",
+            [
+                "Availability_merged",
+                "detail_responsive#available_from",
+                "table.Availability",
+            ],
+        ),
+        Expand("availability", parse_availability, AVAILABILITY_FIELDS),
+        Column("price", "price_cleaned"),
+        Extract("address", ADDRESS_V1),
+    ],
+    outputs=[
+        "living_space",
+        "rooms",
+        "plot_area",
+        "floor_space",
+        "floor",
+        "availability",
+        "available_from",
+        "price",
+        "zip_code",
+        "municipality",
+        "canton",
+        "street",
+        "street_nr",
+    ],
+    passthrough=("ForestDensityL", "type"),
+    gde=GDE,
+    drop=["price_cleaned", "Locality", "Zip"],
+)
+
+## immo_data_202208_v2.parquet and the kaggle validation set, helper_v2
+V2 = Pipeline(
+    steps=[
+        DESCRIPTION,
+        Coalesce(
+            "living_space",
+            ["Living_area_unified", "Space extracted", "description_living_space"],
+            parse=parse_float,
+        ),
+        Coalesce(
+            "rooms",
+            ["rooms", "No. of rooms:", "description_rooms"],
+            parse=parse_room_count,
+        ),
+        Coalesce(
+            "plot_area",
+            ["Plot_area_merged", "detail_responsive#surface_property", "Land area:"],
+            parse=parse_area,
+        ),
+        Coalesce(
+            "floor_space",
+            ["Floor_space_merged", "detail_responsive#surface_usable", "Floor space:"],
+            parse=parse_area,
+        ),
+        Coalesce(
+            "floor",
+            ["Floor_merged", "detail_responsive#floor", "Floor"],
+            parse=parse_floor,
+        ),
+        Coalesce(
+            "availability", ["Availability_merged", "detail_responsive#available_from"]
+        ),
+        Expand("availability", parse_availability, AVAILABILITY_FIELDS),
+        Column("price", "price_cleaned"),
+        Extract("address", ADDRESS, prefix="address."),
+        Extract("address_s", ADDRESS_S, prefix="address_s."),
+        Coalesce("zip_code", ["address.zip_code", "address_s.zip_code"]),
+        Replace("zip_code", ZIP_TYPOS),
+        Coalesce("municipality", ["address.municipality", "address_s.municipality"]),
+        Column("canton", "zip_code", parse=_canton),
+        Column("street", "address.street"),
+        Column("street_nr", "address.street_nr"),
+        Coalesce("type", ["type_unified", "description_type"]),
+        Column("features", "features"),
+        Column("last_refurbishment", "Last refurbishment:"),
+        Column("year_built", "Year built:"),
+    ],
+    outputs=[
+        "living_space",
+        "rooms",
+        "plot_area",
+        "floor_space",
+        "floor",
+        "availability",
+        "available_from",
+        "price",
+        "zip_code",
+        "municipality",
+        "canton",
+        "street",
+        "street_nr",
+        "type",
+        "features",
+        "last_refurbishment",
+        "year_built",
+    ],
+    passthrough=GDE,
+    gde=GDE,
+    drop=["Locality", "Zip"],
+)
+
+## immo_data_202208_v2.parquet via location_parsed, archive/helper_kaggle
+_KAGGLE_STEPS = [
+    Column("living_space", "Living_area_unified", parse=parse_float),
+    Column("rooms", "rooms", parse=parse_room_count),
+    # The archive helpers concatenated these sources, so empty strings fall through
+    Coalesce(
+        "plot_area",
+        ["Plot_area_merged", "detail_responsive#surface_property"],
+        parse=parse_area,
+        empty_as_missing=True,
+    ),
+    Coalesce(
+        "floor_space",
+        ["Floor_space_merged", "detail_responsive#surface_usable"],
+        parse=parse_area,
+        empty_as_missing=True,
+    ),
+    Coalesce(
+        "floor",
+        ["Floor_merged", "detail_responsive#floor"],
+        parse=parse_floor,
+        empty_as_missing=True,
+    ),
+    Coalesce(
+        "availability",
+        ["Availability_merged", "detail_responsive#available_from"],
+        empty_as_missing=True,
+    ),
+    Expand("availability", parse_availability, AVAILABILITY_FIELDS),
+    Column("price", "price_cleaned"),
+    Column("municipality", "Locality"),
+    Extract("location_parsed", LOCATION),
+    Column("type", "type_unified"),
+]
+_KAGGLE_OUTPUTS = [
+    "living_space",
+    "rooms",
+    "plot_area",
+    "floor_space",
+    "floor",
+    "availability",
+    "available_from",
+    "price",
+    "municipality",
+    "street",
+    "street_nr",
+    "zip_code",
+    "canton",
+    "type",
+]
+_KAGGLE_BOUNDS = {
+    "floor": (None, 99),
+    "living_space": (12, 1450),
+    "plot_area": (None, 247330),
+}
+
+KAGGLE = Pipeline(
+    steps=_KAGGLE_STEPS,
+    outputs=[o for o in _KAGGLE_OUTPUTS if o != "price"],
+    passthrough=GDE,
+    gde=GDE,
+    drop=["Locality"],
+    bounds=_KAGGLE_BOUNDS,
+)
+
+## Like KAGGLE with price, archive/helper_new
+NEW = Pipeline(
+    steps=_KAGGLE_STEPS,
+    outputs=_KAGGLE_OUTPUTS,
+    passthrough=GDE,
+    gde=GDE,
+    drop=["Locality"],
+    bounds=dict(_KAGGLE_BOUNDS, price=(30000, None)),
+    drop_duplicates=True,
+)
@@ -0,0 +1,396 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Synthetic raw listings in the layout of the v1, v2 and kaggle datasets, for
+# benchmarks and offline runs. Values follow the formats the parsers expect
+# (addresses, multilingual floors, areas with thousands separators, ...), the gde
+# columns are constant per municipality like in the real data.
+
+VERSIONS = ["v1", "v2", "kaggle"]
+
+CANTONS = [
+    "AG", "AI", "AR", "BE", "BL", "BS", "FR", "GE", "GL", "GR", "JU", "LU", "NE",
+    "NW", "OW", "SG", "SH", "SO", "SZ", "TG", "TI", "UR", "VD", "VS", "ZG", "ZH",
+]  # fmt: skip
+GDE_COLUMNS = [
+    "ForestDensityL",
+    "ForestDensityM",
+    "ForestDensityS",
+    "Latitude",
+    "Longitude",
+    "Locality",
+    "NoisePollutionRailwayL",
+    "NoisePollutionRailwayM",
+    "NoisePollutionRailwayS",
+    "NoisePollutionRoadL",
+    "NoisePollutionRoadM",
+    "NoisePollutionRoadS",
+    "PopulationDensityL",
+    "PopulationDensityM",
+    "PopulationDensityS",
+    "RiversAndLakesL",
+    "RiversAndLakesM",
+    "RiversAndLakesS",
+    "WorkplaceDensityL",
+    "WorkplaceDensityM",
+    "WorkplaceDensityS",
+    "Zip",
+    "distanceToTrainStation",
+    "gde_area_agriculture_percentage",
+    "gde_area_forest_percentage",
+    "gde_area_nonproductive_percentage",
+    "gde_area_settlement_percentage",
+    "gde_average_house_hold",
+    "gde_empty_apartments",
+    "gde_foreigners_percentage",
+    "gde_new_homes_per_1000",
+    "gde_politics_bdp",
+    "gde_politics_cvp",
+    "gde_politics_evp",
+    "gde_politics_fdp",
+    "gde_politics_glp",
+    "gde_politics_gps",
+    "gde_politics_pda",
+    "gde_politics_rights",
+    "gde_politics_sp",
+    "gde_politics_svp",
+    "gde_pop_per_km",
+    "gde_population",
+    "gde_private_apartments",
+    "gde_social_help_quota",
+    "gde_tax",
+    "gde_workers_sector1",
+    "gde_workers_sector2",
+    "gde_workers_sector3",
+    "gde_workers_total",
+]
+
+_PLACES = ["Zürich", "Genève", "Lugano", "Biel/Bienne", "Saint-Imier", "Küssnacht"]
+_STREETS = ["Bahnhofstrasse", "Route de Lausanne", "Via San Gottardo", "Im Feld"]
+_FLOORS = [
+    "Ground floor",
+    "1. floor",
+    "2. floor",
+    "3. floor",
+    "12. floor",
+    "1. Basement",
+    "Basement",
+    "2. Stock",
+    "Erdgeschoss",
+    "1er étage",
+    "Sous-sol",
+    "Piano terra",
+    "",
+]
+_TYPES = ["flat", "penthouse", "detached-house", "terrace-house", "villa", "studio"]
+_TITLES = [
+    "Schöne Wohnung",
+    "Luxuriöse Attika-Wohnung",
+    "Einfamilienhaus mit Garten",
+    "Villa mit Seesicht",
+    "Appartement lumineux",
+    "Studio in Zentrumsnähe",
+]
+_FEATURES = ["Balcony", "Lift", "Balcony, Lift", "Parking space", "Garage, View"]
+
+
+def make_postcodes(n=400, seed=0):
+    """Returns a synthetic postcode sheet in the layout of plz.xlsx.
+
+    Args:
+        n (int, optional): Number of postcodes. Defaults to 400.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        DataFrame: PLZ, Ortschaft, Kantonskürzel and the language columns
+    """
+    rng = np.random.default_rng(seed)
+    plz = np.sort(rng.choice(np.arange(1000, 9700), n, replace=False))
+    municipality = [
+        "{} {}".format(_PLACES[i % len(_PLACES)], i // len(_PLACES) + 1)
+        for i in range(n)
+    ]
+    return pd.DataFrame(
+        {
+            "PLZ": plz,
+            "Ortschaft": municipality,
+            "Kantonskürzel": rng.choice(CANTONS, n),
+            "Kanton": "-",
+            "Canton": "-",
+            "Cantone": "-",
+            "Land": "CH",
+            "Pays": "CH",
+            "Paese": "CH",
+        }
+    )
+
+
+def _missing(rng, values, share):
+    # Replaces a share of the values with None
+    values = np.asarray(values, dtype=object)
+    return np.where(rng.random(len(values)) < share, None, values)
+
+
+def _vocabulary(rng, n, values):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def _join(*parts):
+    # Element-wise concatenation of string arrays and scalar strings
+    joined = None
+    for part in parts:
+        if not isinstance(part, str):
+            part = pd.Series(part, dtype=object)
+        joined = part if joined is None else joined + part
+    return joined.to_numpy(dtype=object)
+
+
+def make_listings(n, version="v2", seed=0, postcodes=None, start=0):
+    """Generates ``n`` synthetic raw listings.
+
+    Args:
+        n (int): Number of rows.
+        version (str, optional): "v1", "v2" or "kaggle". Defaults to "v2".
+        seed (int, optional): Random seed. Defaults to 0.
+        postcodes (DataFrame, optional): Sheet from make_postcodes. Defaults to make_postcodes().
+        start (int, optional): First row number, for generating a file in chunks. Defaults to 0.
+
+    Returns:
+        DataFrame: raw listings in the column layout of ``version``
+    """
+    if version not in VERSIONS:
+        raise ValueError(
+            "Unknown version {!r}, expected one of {}".format(version, VERSIONS)
+        )
+    if postcodes is None:
+        postcodes = make_postcodes()
+    rng = np.random.default_rng([seed, start])
+    n_places = len(postcodes)
+
+    place = rng.integers(0, n_places, n)
+    plz = postcodes["PLZ"].to_numpy()[place]
+    zip_code = plz.astype(str).astype(object)
+    municipality = postcodes["Ortschaft"].to_numpy(dtype=object)[place]
+    canton = postcodes["Kantonskürzel"].to_numpy(dtype=object)[place]
+    street = _join(
+        _vocabulary(rng, n, _STREETS),
+        " ",
+        rng.integers(1, 200, n).astype(str).astype(object),
+        _vocabulary(rng, n, ["", "", "", "a", "b"]),
+    )
+    # Listings without a street carry only "zip municipality"
+    has_street = rng.random(n) < 0.8
+    locality = _join(zip_code, " ", municipality)
+    address = np.where(
+        has_street,
+        _join(street, ", ", locality, ", ", canton),
+        locality + ", " + canton,
+    )
+    rooms = _vocabulary(rng, n, ["1", "1.5", "2", "2.5", "3.5", "4.5", "5.5", "7"])
+    living_space = rng.integers(15, 400, n).astype(float)
+    areas = np.asarray(
+        ["{:,} m²".format(v) for v in rng.integers(50, 30000, 2000)], dtype=object
+    )
+    dates = pd.date_range("2022-01-01", periods=700).strftime("%d.%m.%Y").to_numpy()
+    statuses = ["On request", "Immediately", "Sofort", "Auf Anfrage", "à convenir"]
+    availability = np.concatenate(
+        [statuses * 80, dates, ["ab " + d for d in dates[:100]]]
+    )
+
+    d = {}
+    d["Unnamed: 0"] = np.arange(start, start + n)
+    d["Unnamed: 0.1"] = np.arange(start, start + n)
+    # Raw columns with the same parsed meaning, each partially filled
+    for column in [
+        "Plot_area_merged",
+        "detail_responsive#surface_property",
+        "Floor_space_merged",
+        "detail_responsive#surface_usable",
+    ]:
+        d[column] = _missing(rng, _vocabulary(rng, n, areas), 0.6)
+    for column in ["Floor_merged", "detail_responsive#floor"]:
+        d[column] = _missing(rng, _vocabulary(rng, n, _FLOORS), 0.5)
+    for column in ["Availability_merged", "detail_responsive#available_from"]:
+        d[column] = _missing(rng, _vocabulary(rng, n, availability), 0.4)
+    d["address"] = _missing(rng, address, 0.05)
+    d["Space extracted"] = np.where(rng.random(n) < 0.3, np.nan, living_space)
+
+    if version == "v1":
+        description = _join(rooms, " rooms, ", living_space.astype(int).astype(str))
+        d["details_structured"] = _join(
+            "{'Municipality': '",
+            municipality,
+            "', 'Living space': '",
+            living_space.astype(int).astype(str),
+            " m²', 'location': '",
+            locality,
+            ", ",
+            canton,
+            "', 'description': '",
+            description,
+            " m²«Schöne Wohnung»'}",
+        )
+        # Scraped table with the quotes of the class attributes replaced by ####
+        cell = "<td class=####DataTable__SimpleCell-sc-1o2xig5-2 rJZBK####>"
+        d["table"] = _missing(
+            rng,
+            _join(
+                "<table><tbody><tr>",
+                cell,
+                "Municipality</td>",
+                cell,
+                municipality,
+                "</td></tr><tr>",
+                cell,
+                "Living space</td>",
+                cell,
+                living_space.astype(int).astype(str),
+                " m²</td></tr><tr>",
+                cell,
+                "Availability</td>",
+                cell,
+                _vocabulary(rng, n, availability),
+                "</td></tr></tbody></table>",
+            ),
+            0.3,
+        )
+    else:
+        d["Living_area_unified"] = np.where(rng.random(n) < 0.2, np.nan, living_space)
+        d["rooms"] = _missing(rng, rooms + "rm", 0.3)
+        d["No. of rooms:"] = _missing(rng, rooms, 0.5)
+        d["Land area:"] = _missing(rng, _vocabulary(rng, n, areas), 0.8)
+        d["Floor space:"] = _missing(rng, _vocabulary(rng, n, areas), 0.8)
+        d["Floor"] = _missing(rng, _vocabulary(rng, n, _FLOORS), 0.7)
+        d["address_s"] = _missing(
+            rng, np.where(has_street, street + ", ", "") + locality, 0.5
+        )
+        d["location_parsed"] = _missing(
+            rng,
+            _join(
+                np.where(has_street, "Strasse: " + street + " ", ""),
+                "plz: ",
+                zip_code,
+                " Ort: ",
+                municipality,
+                " Kanton: ",
+                canton,
+            ),
+            0.05,
+        )
+        d["type_unified"] = _vocabulary(rng, n, _TYPES)
+        d["features"] = _missing(rng, _vocabulary(rng, n, _FEATURES), 0.4)
+        d["Last refurbishment:"] = _missing(
+            rng, rng.integers(1960, 2023, n).astype(float), 0.7
+        )
+        d["Year built:"] = _missing(rng, rng.integers(1850, 2023, n).astype(float), 0.4)
+
+    # gde block, constant per municipality apart from the coordinates
+    gde = np.random.default_rng(seed).random((n_places, len(GDE_COLUMNS)))
+    for i, column in enumerate(GDE_COLUMNS):
+        if column == "Locality":
+            d[column] = municipality
+        elif column == "Zip":
+            d[column] = plz
+        elif column == "Latitude":
+            d[column] = 45.8 + 2 * gde[place, i] + rng.normal(0, 0.01, n)
+        elif column == "Longitude":
+            d[column] = 6.0 + 4 * gde[place, i] + rng.normal(0, 0.01, n)
+        else:
+            d[column] = gde[place, i]
+
+    price = rng.lognormal(13.7, 0.5, n).round(-3)
+    if version == "v1":
+        # v1 keeps the price and type after the gde block
+        d["price_cleaned"] = price
+        d["type"] = _vocabulary(rng, n, _TYPES)
+    elif version == "v2":
+        d["price_cleaned"] = price
+    if version != "kaggle":
+        d["description"] = _missing(
+            rng,
+            _join(
+                rooms,
+                " rooms, ",
+                living_space.astype(int).astype(str),
+                " m²«",
+                _vocabulary(rng, n, _TITLES),
+                "»CHF ",
+                np.asarray(["{:,.0f}".format(p) for p in price], dtype=object),
+                ".—",
+            ),
+            0.1,
+        )
+    return pd.DataFrame(d)
+
+
+def write_listings(path, n, version="v2", seed=0, postcodes=None, chunk_rows=500000):
+    """Writes ``n`` synthetic listings chunk by chunk, so large files fit in memory.
+
+    Args:
+        path (str): Output file, .parquet or .csv.
+        n (int): Number of rows.
+        version (str, optional): "v1", "v2" or "kaggle". Defaults to "v2".
+        seed (int, optional): Random seed. Defaults to 0.
+        postcodes (DataFrame, optional): Sheet from make_postcodes. Defaults to make_postcodes().
+        chunk_rows (int, optional): Rows generated at once. Defaults to 500000.
+
+    Returns:
+        str: ``path``
+    """
+    if postcodes is None:
+        postcodes = make_postcodes()
+    csv = os.path.splitext(path)[1] == ".csv"
+    writer = None
+    try:
+        for start in range(0, n, chunk_rows):
+            chunk = make_listings(
+                min(chunk_rows, n - start), version, seed, postcodes, start
+            )
+            if csv:
+                chunk.to_csv(
+                    path, index=False, mode="a" if start else "w", header=not start
+                )
+                continue
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def write_fixtures(root, n, version="v2", seed=0):
+    """Writes a synthetic dataset and postcode sheet for offline runs.
+
+    Point $IMMO_PLZ_URL to the returned "postcodes" path before cleaning, see
+    postcodes.load_postcodes.
+
+    Args:
+        root (str): Output directory.
+        n (int): Number of listings.
+        version (str, optional): "v1", "v2" or "kaggle". Defaults to "v2".
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: paths of the "listings" and "postcodes" files
+    """
+    os.makedirs(root, exist_ok=True)
+    postcodes = make_postcodes(seed=seed)
+    # The listings use the postcodes of their seed
+    plz_path = os.path.join(root, "plz_{}.xlsx".format(seed))
+    if not os.path.exists(plz_path):
+        postcodes.to_excel(plz_path, sheet_name="Blatt1", index=False)
+    extension = ".csv" if version == "v1" else ".parquet"
+    name = "{}_{}_{}{}".format(version, n, seed, extension)
+    path = os.path.join(root, name)
+    if not os.path.exists(path):
+        partial = os.path.join(root, "partial_" + name)
+        write_listings(partial, n, version, seed, postcodes)
+        os.replace(partial, path)
+    return {"listings": path, "postcodes": plz_path}
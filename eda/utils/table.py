@@ -0,0 +1,54 @@
+import html
+import re
+
+from .parsers import map_unique_dicts
+
+# One table row: a key cell followed by a value cell. The scraped cells carry
+# generated class attributes with the quotes replaced by ####, e.g.
+# <td class=####DataTable__SimpleCell-sc-1o2xig5-2 ... rJZBK####>Le Mouret</td>
+_ROW = re.compile(r"<tr[^>]*>\s*<td[^>]*>(.*?)</td>\s*<td[^>]*>(.*?)</td>", re.S)
+_TAG = re.compile(r"<[^>]+>")
+
+
+def _text(cell):
+    return html.unescape(_TAG.sub("", cell)).strip()
+
+
+def parse_table_value(x):
+    """Parses a single value of the raw html ``table`` column.
+
+    All key/value rows of all tables are read in one scan of the string, inner tags
+    are removed and html entities decoded.
+
+    Args:
+        x (str): table value.
+
+    Returns:
+        dict: key to value mapping, the first row wins for repeated keys
+    """
+    parsed = {}
+    for key, value in _ROW.findall(x):
+        parsed.setdefault(_text(key), _text(value))
+    return parsed
+
+
+def _parse(x):
+    return parse_table_value(x) if isinstance(x, str) else {}
+
+
+def parse_table(series, keys=None):
+    """Expands the html ``table`` column into one column per key.
+
+    Replaces one ``str.extract`` per field, e.g.
+    ``df["table"].str.extract("Municipality.+?rJZBK####>(.+?)<\\/td>")``: every
+    distinct string is scanned once and each column is gathered from the parsed
+    uniques in one take.
+
+    Args:
+        series (Series): table values.
+        keys (list, optional): Keys to extract, e.g. ["Municipality", "Availability"]. Uses every key found, in order of first appearance, if left default. Defaults to None.
+
+    Returns:
+        DataFrame: one object column per key with the index of ``series``, NaN for missing keys
+    """
+    return map_unique_dicts(series, _parse, keys)
@@ -0,0 +1,110 @@
+import contextlib
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+class StageTracer(object):
+    """Records wall time, rows and memory of the named stages of a cleaning run.
+
+    Pass it as ``tracer`` to process_data. Memory is measured with tracemalloc
+    (Python and NumPy allocations) while the tracer is used as a context manager,
+    otherwise only if tracemalloc is already tracing. Stage records stay in the
+    calling process, so use it with process_data or iter_process, not
+    process_parallel.
+
+        with StageTracer(memory=True) as tracer:
+            helper.process_data(tracer=tracer)
+        tracer.to_frame()
+
+    Args:
+        memory (bool, optional): Trace memory within ``with``. Defaults to False.
+        log (Logger, optional): Logs every finished stage at INFO level. Defaults to None.
+    """
+
+    def __init__(self, memory=False, log=None):
+        self.memory = memory
+        self.log = log
+        self.records = []
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def __exit__(self, *exc):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return False
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        """Context manager recording one stage.
+
+        Args:
+            name (str): Stage name.
+            rows (int, optional): Rows processed by the stage. Defaults to None.
+        """
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {
+                "stage": name,
+                "seconds": time.perf_counter() - start,
+                "rows": rows,
+                "memory_delta_mb": None,
+                "peak_mb": None,
+            }
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                record["memory_delta_mb"] = (current - before) / 1024**2
+                record["peak_mb"] = (peak - before) / 1024**2
+            self.records.append(record)
+            if self.log is not None:
+                self.log.info("stage %(stage)s took %(seconds).4fs", record)
+
+    def to_frame(self, summary=False):
+        """Returns the stage records as a DataFrame.
+
+        Args:
+            summary (bool, optional): One row per stage name, summed over repeated runs such as the chunks of iter_process. Defaults to False.
+
+        Returns:
+            DataFrame: stage, seconds, rows, memory_delta_mb and peak_mb
+        """
+        frame = pd.DataFrame(
+            self.records,
+            columns=["stage", "seconds", "rows", "memory_delta_mb", "peak_mb"],
+        )
+        if summary:
+            frame = frame.groupby("stage", sort=False).agg(
+                seconds=("seconds", "sum"),
+                rows=("rows", "sum"),
+                memory_delta_mb=("memory_delta_mb", lambda s: s.sum(min_count=1)),
+                peak_mb=("peak_mb", "max"),
+                calls=("stage", "size"),
+            )
+            frame = frame.reset_index()
+        return frame
+
+    def to_json(self, path):
+        """Writes the stage records to ``path`` as a JSON list."""
+        with open(path, "w") as f:
+            json.dump(self.records, f, indent=1)
+
+
+def trace(tracer, name, rows=None):
+    """Returns tracer.stage(name, rows), or a no-op context if ``tracer`` is None."""
+    if tracer is None:
+        return contextlib.nullcontext()
+    return tracer.stage(name, rows)